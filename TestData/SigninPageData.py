@@ -1,3 +1,11 @@
+import os
+
+from utilities import DataStore
+
+# Directory holding the external test data files
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
 class SigninPageData:
     """
     Class to hold data and constants related to the SignIn Page.
@@ -18,17 +26,10 @@ class SigninPageData:
     hide_pass_type = "password"
     # Password input type when password is visible
     show_pass_type = "text"
-    # Valid email used for successful sign-in
-    valid_email = "bennyaleesha1234@gmail.com"
-    # Valid password used for successful sign-in
-    valid_pass = "Aleesha1234"
-    # Expected greeting message after successful sign-in
-    expected_msg = "Hi, Aleesha"
-    # List of dictionaries containing invalid email and password combinations for testing
-    invalid_email_set = [
-        {"inval_email": "dummy1234", "inval_pass": "dummy"},
-        {"inval_email": "dummy_email@email", "inval_pass": "dummy_pass"},
-        {"inval_email": "dummyeamil2@.com", "inval_pass": "dummy1234"},
-        {"inval_email": "123456", "inval_pass": "passunlock"},
-        {"inval_email": "dummy.com", "inval_pass": "nopass"}
-    ]
+    # Account used for successful sign-in and the greeting shown once signed in, read from
+    # SIGNIN_EMAIL/SIGNIN_PASSWORD/SIGNIN_GREETING or from data/credentials.json (not versioned,
+    # see credentials.example.json)
+    credentials_file = os.path.join(data_dir, "credentials.json")
+    credentials_env = {"email": "SIGNIN_EMAIL", "password": "SIGNIN_PASSWORD", "greeting": "SIGNIN_GREETING"}
+    # Invalid email and password combinations for testing, read lazily from data/invalid_emails.csv
+    invalid_email_set = DataStore.DataSet(os.path.join(data_dir, "invalid_emails.csv"), key="inval_email")
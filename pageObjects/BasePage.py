@@ -0,0 +1,120 @@
+import re
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit
+
+from pageObjects import Navigation
+from utilities import Waits
+
+
+class BasePage(ABC):
+    """
+    Base class of the page objects.
+    Holds the WebDriver instance and the explicit wait shared by every page object on that driver.
+    """
+
+    # Explicit wait timeout in seconds, overridden by pages with slower content
+    timeout = 10
+    # Regular expression the URL path of the page matches, None for pages without their own URL
+    url_path = None
+    # Name of the overlay the page object stands for, None for full pages
+    overlay = None
+
+    # Defines findAll(by, value), returning every element matching a Selenium locator in document order
+    find_elements_script = Waits.find_elements_script
+
+    # Locates every element matching a (By, value) locator and reads the requested
+    # properties of each one, so a whole list costs a single round trip
+    fetch_properties_script = find_elements_script + """
+        var by = arguments[0], value = arguments[1], properties = arguments[2];
+        var nodes = findAll(by, value);
+        function read(el, property) {
+            switch (property) {
+                case 'text':
+                    return el.innerText.trim();
+                case 'tag':
+                    return el.tagName.toLowerCase();
+                case 'visible':
+                    var style = window.getComputedStyle(el);
+                    return el.getClientRects().length > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+            }
+            var result = el[property];
+            if (result === undefined || (typeof result === 'object' && result !== null) || typeof result === 'function') {
+                return el.getAttribute(property);
+            }
+            return result;
+        }
+        return Array.prototype.map.call(nodes, function (el) {
+            var row = {};
+            properties.forEach(function (property) { row[property] = read(el, property); });
+            return row;
+        });
+    """
+
+    def __init__(self, driver):
+        """
+        Initializes the page object with a WebDriver instance.
+        :param driver: WebDriver instance used to interact with the browser.
+        """
+        self.driver = driver
+        self.wait = Waits.waiter_for(self.driver, self.timeout)
+        self.navigation = Navigation.state_for(self.driver)
+
+    @classmethod
+    def ensure(cls, driver):
+        """
+        Returns the page object for the page the browser should be on, navigating only when
+        the tracked navigation state shows the browser somewhere else.
+        :param driver: WebDriver instance.
+        :return: Instance of the page object class
+        """
+        if not Navigation.state_for(driver).is_on(cls, driver.current_url):
+            cls.open(driver)
+        return cls(driver)
+
+    @classmethod
+    @abstractmethod
+    def open(cls, driver):
+        """
+        Navigates the browser to this page and records the transition, for ensure().
+        :param driver: WebDriver instance.
+        """
+
+    @classmethod
+    def matches_url(cls, url, home_url=None):
+        """
+        Tells whether a URL shows this page: same site as the home page and a path matching url_path.
+        :param url: URL to check.
+        :param home_url: URL of the site's home page, None to accept any site.
+        :return: True when the URL belongs to the page
+        """
+        parts = urlsplit(url)
+        if home_url and parts.netloc != urlsplit(home_url).netloc:
+            return False
+        return cls.url_path is None or re.fullmatch(cls.url_path, parts.path or "/") is not None
+
+    def wait_for_network_idle(self):
+        """
+        Waits for the requests started by the last action to finish, e.g. a cart update before the page is reloaded.
+        """
+        self.wait.until(Waits.network_idle())
+
+    def wait_for_dom_stable(self):
+        """
+        Waits for the page to stop rendering, e.g. before its source is read.
+        """
+        self.wait.until(Waits.dom_stable())
+
+    def fetch_properties(self, locator, properties, condition=Waits.element_present):
+        """
+        Reads properties of every element matching the locator in one script call, once the condition holds.
+        Supported names are 'text', 'tag', 'visible', any DOM property (e.g. 'value', 'type', 'checked')
+        and, when no such property exists, any HTML attribute.
+        :param locator: (By, value) tuple locating the elements.
+        :param properties: List of property names to read.
+        :param condition: Factory from utilities.Waits the page waits on before reading, None to read at once.
+        :return: List with one dict of property name to value per element, in document order
+        """
+        if condition is not None:
+            self.wait.until(condition(locator))
+        by, value = locator
+        return self.driver.execute_script(BasePage.fetch_properties_script, by, value, list(properties))
@@ -0,0 +1,123 @@
+from selenium.common.exceptions import StaleElementReferenceException
+
+from utilities import Waits
+
+
+class CachedElement:
+    """
+    Lazy stand-in for a WebElement.
+    The element is located on first use and reused afterwards; it is located again
+    only when the driver reports it as stale.
+    """
+
+    def __init__(self, resolve):
+        """
+        Initializes the CachedElement.
+        :param resolve: Callable locating and returning the WebElement.
+        """
+        self._resolve = resolve
+        self._element = None
+
+    @property
+    def element(self):
+        """
+        Returns the underlying WebElement, locating it if needed.
+        :return: WebElement
+        """
+        if self._element is None:
+            self._element = self._resolve()
+        return self._element
+
+    def _retry(self, action):
+        try:
+            return action(self.element)
+        except StaleElementReferenceException:
+            self._element = self._resolve()
+            return action(self._element)
+
+    def __getattr__(self, name):
+        value = self._retry(lambda element: getattr(element, name))
+        if not callable(value):
+            return value
+
+        def _call(*args, **kwargs):
+            return self._retry(lambda element: getattr(element, name)(*args, **kwargs))
+        return _call
+
+    def __bool__(self):
+        return self.element is not None
+
+    def __eq__(self, other):
+        if isinstance(other, CachedElement):
+            other = other.element
+        return self.element == other
+
+    def __hash__(self):
+        return hash(self.element)
+
+
+class Element:
+    """
+    Declarative element of a page object.
+    Accessing it on a page instance returns a CachedElement kept for the lifetime of that instance.
+    """
+
+    def __init__(self, locator, condition=None, parent=None):
+        """
+        Initializes the Element descriptor.
+        :param locator: (By, value) tuple locating the element.
+        :param condition: Optional factory from utilities.Waits (e.g. Waits.element_visible)
+                          the page waits on before using the element.
+        :param parent: Optional Element the locator is searched within.
+        """
+        self.locator = locator
+        self.condition = condition
+        self.parent = parent
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, page, owner):
+        if page is None:
+            return self
+        cache = page.__dict__.setdefault("_elements", {})
+        if self.name not in cache:
+            cache[self.name] = CachedElement(lambda: self.resolve(page))
+        return cache[self.name]
+
+    def resolve(self, page):
+        """
+        Locates the element on the page, bypassing the cache.
+        :param page: Page object instance.
+        :return: WebElement
+        """
+        if self.parent is not None:
+            parent = self.parent.__get__(page, type(page))
+            if Waits.mode == "event":  # No implicit wait covers the lookup
+                return page.wait.until(lambda driver: parent.find_element(*self.locator))
+            return parent.find_element(*self.locator)
+        if self.condition is not None:
+            return page.wait.until(self.condition(self.locator))
+        if Waits.mode == "event":
+            return page.wait.until(Waits.element_present(self.locator))
+        return page.driver.find_element(*self.locator)
+
+
+class Elements(Element):
+    """
+    Declarative list of elements of a page object.
+    Lists are located again on every access since their content changes as the page is used.
+    """
+
+    def __get__(self, page, owner):
+        if page is None:
+            return self
+        return self.resolve(page)
+
+    def resolve(self, page):
+        if self.condition is not None:
+            page.wait.until(self.condition(self.locator))
+        elif Waits.mode == "event":  # No implicit wait covers the lookup
+            page.wait.until(Waits.element_present(self.locator))
+        return page.driver.find_elements(*self.locator)
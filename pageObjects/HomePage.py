@@ -1,24 +1,21 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from pageObjects import Navigation
+from pageObjects.BasePage import BasePage
+from pageObjects.Element import Element, Elements
 from pageObjects.ShopPage import ShopPage
 
 from TestData.HomePageData import HomePageData
+from utilities import Waits
 
 
-class HomePage:
+class HomePage(BasePage):
     """
     Page Object Model for the Home Page of the website.
     This class provides methods to interact with elements on the Home Page.
     """
 
-    def __init__(self, driver):
-        """
-        Initializes the HomePage object with a WebDriver instance.
-        :param driver: WebDriver instance used to interact with the browser.
-        """
-        self.driver = driver
-        self.wait = WebDriverWait(self.driver, 10) # Explicit wait with a timeout of 10 seconds
+    timeout = 10  # Explicit wait with a timeout of 10 seconds
+    url_path = "/"
 
     # Locators for various elements on the Home Page
     header_tag = (By.XPATH, "//div[@class='sc-cfda7d4b-0 fUeOuH']")
@@ -31,65 +28,88 @@ class HomePage:
     category_overlay_locator = (By.XPATH, "//div[@id='overlay-:Rjkmuqlm:']")
     school_locator = (By.XPATH, "(//span[text()='Back to School'])[2]")
 
+    # Elements located lazily and cached per page instance
+    header_element = Element(header_tag)
+    search_element = Element(search_tag)
+    search_button_element = Element(search_button)
+    navbar_content_elements = Elements(navbar_content_locator)
+    home_icon_element = Element(home_icon)
+    category_element = Element(category_locator, Waits.element_visible)
+    category_overlay_element = Element(category_overlay_locator, Waits.overlay_settled)
+    school_element = Element(school_locator, parent=category_overlay_element)
+
+    @classmethod
+    def open(cls, driver):
+        """
+        Navigates to the home page of the site under test.
+        :param driver: WebDriver instance.
+        """
+        state = Navigation.state_for(driver)
+        driver.get(state.home_url)
+        state.arrived(HomePage, state.home_url)
+
     def locate_header(self):
         """
         Locates and returns the header element.
         :return: WebElement for the header
         """
-        return self.driver.find_element(*HomePage.header_tag)
+        return self.header_element
 
     def locate_search(self):
         """
         Locates and returns the search input element.
         :return: WebElement for the search input
         """
-        return self.driver.find_element(*HomePage.search_tag)
+        return self.search_element
 
     def locate_search_button(self):
         """
         Locates and returns the search button element.
         :return: WebElement for the search button
         """
-        return self.driver.find_element(*HomePage.search_button)
+        return self.search_button_element
 
     def locate_results(self):
         """
         Waits for the results element to be visible on the page.
         This method does not return the element but ensures it is visible.
         """
-        self.wait.until(EC.visibility_of_element_located(HomePage.results_locator))
+        self.wait.until(Waits.element_visible(HomePage.results_locator))
 
     def locate_navbar_contents(self):
         """
         Locates and returns a list of header content elements.
         :return: List of WebElements for the header contents
         """
-        return self.driver.find_elements(*HomePage.navbar_content_locator)
+        return self.navbar_content_elements
+
+    def get_navbar_texts(self):
+        """
+        Reads the text of every header content element in a single round trip.
+        :return: List of strings for the header contents
+        """
+        return [item["text"] for item in self.fetch_properties(HomePage.navbar_content_locator, ["text"])]
 
     def locate_home_icon(self):
         """
         Locates and returns the home icon element.
         :return: WebElement for the home icon
         """
-        return self.driver.find_element(*HomePage.home_icon)
+        return self.home_icon_element
 
     def locate_category(self):
         """
         Waits for the category button to be visible and then returns it.
         :return: WebElement for the category button
         """
-
-        cat_button = self.wait.until(EC.visibility_of_element_located(HomePage.category_locator))
-        return cat_button
+        return self.category_element
 
     def get_school_option(self):
         """
-        Waits for the category overlay to be visible, then locates and returns the back to school option within it.
+        Waits for the category overlay to be visible and settled, then locates and returns the back to school option within it.
         :return: WebElement for the school option
         """
-        category_overlay = self.wait.until(EC.visibility_of_element_located(HomePage.category_overlay_locator))
-        school_options = category_overlay.find_element(*HomePage.school_locator)
-        return school_options
+        return self.school_element
 
     def search_item(self):
         """
@@ -99,6 +119,7 @@ class HomePage:
         """
         self.locate_search().send_keys(HomePageData.search_item)  # Enter search term
         self.locate_search_button().click()  # Click the search button
+        self.navigation.arrived(ShopPage)  # Track the transition to the search results
         shopPage = ShopPage(self.driver)  # Create a ShopPage object
         return shopPage  # Return the ShopPage object for further interactions
 
@@ -0,0 +1,83 @@
+import weakref
+
+# One state per driver, shared by every page object built on that driver
+_states = weakref.WeakKeyDictionary()
+
+
+class NavigationState:
+    """
+    What the page objects know about the page a browser is showing: the URL last seen,
+    the page object type shown and the overlay left open on it, if any.
+    """
+
+    def __init__(self):
+        self.home_url = None
+        self.url = None
+        self.page = None
+        self.overlay = None
+
+    def start(self, home_url, page):
+        """
+        Records that the browser opened the site's home page.
+        :param home_url: URL of the home page, used when a page object has to navigate back to it.
+        :param page: Page object type of the home page.
+        """
+        self.home_url = home_url
+        self.arrived(page, home_url)
+
+    def arrived(self, page, url=None):
+        """
+        Records a transition to another page; overlays of the previous page are gone.
+        :param page: Page object type now shown.
+        :param url: URL of the page when already known.
+        """
+        self.page = page
+        self.url = url
+        self.overlay = None
+
+    def opened(self, overlay):
+        """
+        Records an overlay opened on the current page, e.g. 'cart'.
+        """
+        self.overlay = overlay
+
+    def closed(self):
+        """
+        Records that the open overlay was closed.
+        """
+        self.overlay = None
+
+    def forget(self):
+        """
+        Drops everything known, e.g. when the browser was navigated outside the page objects.
+        """
+        self.url = self.page = self.overlay = None
+
+    def is_on(self, page, url):
+        """
+        Tells whether the browser is showing a page object, checking the tracked type against the current URL.
+        A URL the tracked page does not match means the browser left it, so the state is forgotten.
+        :param page: Page object type, or overlay page type when it defines `overlay`.
+        :param url: Current URL of the browser.
+        :return: True when no navigation is needed to reach the page
+        """
+        if self.page is None or not self.page.matches_url(url, self.home_url):
+            self.forget()
+            return False
+        self.url = url
+        if page.overlay:
+            return self.overlay == page.overlay
+        return self.page is page
+
+
+def state_for(driver):
+    """
+    Returns the navigation state of a driver, creating it on first use.
+    :param driver: WebDriver instance.
+    :return: NavigationState
+    """
+    state = _states.get(driver)
+    if state is None:
+        state = _states[driver] = NavigationState()
+    return state
+
@@ -1,22 +1,18 @@
-import time
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
 
+from pageObjects.BasePage import BasePage
+from pageObjects.Element import Element, Elements
+from utilities import Waits
 
-class ShopPage:
+
+class ShopPage(BasePage):
     """
     Page Object Model for the Shop Page of the website.
     This class provides methods to interact with elements on the Shop Page.
     """
 
-    def __init__(self, driver):
-        """
-        Initializes the ShopPage object with a WebDriver instance.
-        :param driver: WebDriver instance used to interact with the browser.
-        """
-        self.driver = driver
-        self.wait = WebDriverWait(self.driver, 15)  # Explicit wait with a timeout of 15 seconds
+    timeout = 15  # Explicit wait with a timeout of 15 seconds
+    url_path = "/s"  # Search results
 
     # Locators for various elements on the Shop Page
     cart_locator = (By.XPATH, "//div[@data-test='@web/CartIcon']")
@@ -32,68 +28,83 @@ class ShopPage:
     number_locator = (By.XPATH, "//li[3]")
     cross_button_locator = (By.XPATH, "//button[@data-test='cartItem-deleteBtn']")
 
+    # Elements located lazily and cached per page instance
+    cart_element = Element(cart_locator, Waits.element_clickable)
+    cart_msg_element = Element(cart_msg_locator, Waits.element_visible)
+    add_cart_element = Element(add_cart_locator, Waits.overlay_settled)
+    cart_overlay_element = Element(cart_overlay_locator, Waits.overlay_settled)
+    overlay_add_element = Element(overlay_add_locator, parent=cart_overlay_element)
+    checkout_overlay_element = Element(checkout_overlay_locator, Waits.overlay_settled)
+    checkout_element = Element(go_checkout_locator, parent=checkout_overlay_element)
+    items_element = Element(item_locator, Waits.element_visible)
+    number_drop_element = Element(number_drop_locator, Waits.element_visible)
+    number_element = Element(number_locator, parent=number_drop_element)
+    del_button_elements = Elements(cross_button_locator, Waits.element_visible)
+
+    @classmethod
+    def open(cls, driver):
+        """
+        Shows the search results by searching for HomePageData.search_item from the home page.
+        :param driver: WebDriver instance.
+        """
+        from pageObjects.HomePage import HomePage  # HomePage imports ShopPage for search_item()
+        HomePage.ensure(driver).search_item()
+
     def locate_cart(self):
         """
-        Locates and returns the cart icon element.
+        Waits for the cart icon to be clickable and returns it.
         :return: WebElement for the cart icon
         """
-        return self.driver.find_element(*ShopPage.cart_locator)
+        return self.cart_element
 
     def locate_cart_msg(self):
         """
-        Locates and returns the message when clicked on cart.
+        Waits for the message shown when clicked on cart to be visible and returns it.
         :return: WebElement for the cart message
         """
-        return self.driver.find_element(*ShopPage.cart_msg_locator)
+        return self.cart_msg_element
 
     def locate_add_cart(self):
         """
-        Locates and returns the 'Add to cart' button element.
+        Waits for the first 'Add to cart' button to be clickable and to stop moving
+        while the search results render, then returns it.
         :return: WebElement for the 'Add to cart' button
         """
-        time.sleep(5)  # Sleep is used to wait for the element to be interactable
-        add_cart = self.wait.until(EC.element_to_be_clickable(ShopPage.add_cart_locator))
-        return add_cart.find_element(*ShopPage.add_cart_locator)
+        self.wait.until(Waits.element_clickable(ShopPage.add_cart_locator))
+        return self.add_cart_element
 
     def locate_overlay_add(self):
         """
-        Waits for the cart overlay to be visible, then locates and returns the add to cart on overlay.
+        Waits for the cart overlay to be visible and settled, then locates and returns the add to cart on overlay.
         :return: WebElement for the add overlay element
         """
-        cart_overlay = self.wait.until(EC.visibility_of_element_located(ShopPage.cart_overlay_locator))
-        overlay_add = cart_overlay.find_element(*ShopPage.overlay_add_locator)
-        return overlay_add
+        self.navigation.opened("cart")
+        return self.overlay_add_element
 
     def locate_checkout(self):
         """
-        Waits for the checkout overlay to be visible, then locates and returns the 'View cart & check out' button.
+        Waits for the checkout overlay to be visible and settled, then locates and returns the 'View cart & check out' button.
         :return: WebElement for the checkout button
         """
-        checkout_overlay = self.wait.until(EC.visibility_of_element_located(ShopPage.checkout_overlay_locator))
-        checkout_button = checkout_overlay.find_element(*ShopPage.go_checkout_locator)
-        return checkout_button
+        return self.checkout_element
 
     def locate_items(self):
         """
-        Locates and returns the items element on the Shop Page.
+        Waits for the items element on the Shop Page to be visible and returns it.
         :return: WebElement for the items
         """
-        return self.driver.find_element(*ShopPage.item_locator)
+        return self.items_element
 
     def locate_number(self):
         """
         Waits for the number dropdown to be visible, then locates and returns the number element within the dropdown.
         :return: WebElement for the number element
         """
-        number_drop = self.wait.until(EC.visibility_of_element_located(ShopPage.number_drop_locator))
-        number = number_drop.find_element(*ShopPage.number_locator)
-        return number
+        return self.number_element
 
     def locate_del_button(self):
         """
         Waits for the delete button elements to be visible on the cart page, then returns a list of those elements.
         :return: List of WebElements for the delete buttons
         """
-        self.wait.until(EC.visibility_of_element_located(ShopPage.cart_page_locator))
-        cross_button_list = self.driver.find_elements(*ShopPage.cross_button_locator)
-        return cross_button_list
+        return self.del_button_elements
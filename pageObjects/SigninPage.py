@@ -1,23 +1,22 @@
-import time
 import pytest
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
+from pageObjects import Navigation
+from pageObjects.BasePage import BasePage
+from pageObjects.Element import Element
+from pageObjects.HomePage import HomePage
+from utilities import Waits
 
-class SigninPage:
+
+class SigninPage(BasePage):
     """
     Page Object Model for the SignIn Page of the website.
     This class provides methods to interact with elements on the SignIn Page.
     """
 
-    def __init__(self, driver):
-        """
-        Initializes the SigninPage object with a WebDriver instance.
-        :param driver: WebDriver instance used to interact with the browser.
-        """
-        self.driver = driver
-        self.wait = WebDriverWait(self.driver, 10)  # Implicit wait with a timeout of 10 seconds
+    timeout = 10  # Explicit wait with a timeout of 10 seconds
+    url_path = "/login"  # Login page the 'Sign in' tab of the account dialog leads to
 
     # Locators for various elements on the Sign In Page
     signin_button_locator = (By.XPATH, "//span[text()='Sign in']")
@@ -32,83 +31,162 @@ class SigninPage:
     hide_button_locator = (By.XPATH, "//button[text()='hide']")
     user_wish_locator = (By.CSS_SELECTOR, "span[class='sc-58ad44c0-3 kwbrXj h-margin-r-x3']")
 
+    # Elements located lazily and cached per page instance
+    signin_button_element = Element(signin_button_locator, Waits.element_clickable)
+    signin_tab_element = Element(signin_tab_locator, Waits.element_clickable)
+    login_element = Element(login_locator, Waits.element_visible)
+    email_error_element = Element(email_error_locator, Waits.element_visible)
+    pass_error_element = Element(pass_error_locator, Waits.element_visible)
+    pass_tab_element = Element(pass_tab_locator, Waits.element_visible)
+    email_tab_element = Element(email_tab_locator, Waits.element_visible)
+    show_button_element = Element(show_button_locator, Waits.element_clickable)
+    hide_button_element = Element(hide_button_locator, Waits.element_clickable)
+    user_wish_element = Element(user_wish_locator, Waits.element_visible)
+
+    # Empties the given input fields through the native value setter and fires the events
+    # the page listens to, so its form state is reset as if the user had cleared them
+    reset_form_script = """
+        var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+        for (var i = 0; i < arguments.length; i++) {
+            var field = document.getElementById(arguments[i]);
+            if (!field) { continue; }
+            setter.call(field, '');
+            field.dispatchEvent(new Event('input', {bubbles: true}));
+            field.dispatchEvent(new Event('change', {bubbles: true}));
+        }
+    """
+
+    # Tells whether any of the given elements is shown, without waiting for missing ones
+    errors_shown_script = """
+        return Array.prototype.some.call(arguments, function (id) {
+            var el = document.getElementById(id);
+            return !!el && el.getClientRects().length > 0 && window.getComputedStyle(el).visibility !== 'hidden';
+        });
+    """
+    # Seconds the error messages of the previous submission get to go away after a reset
+    errors_cleared_timeout = 3
+
+    @classmethod
+    def open(cls, driver):
+        """
+        Opens the Sign In page from the account dialog of the current page, loading the home page first
+        when no page of the site is shown.
+        :param driver: WebDriver instance.
+        """
+        if Navigation.state_for(driver).page is None:
+            HomePage.ensure(driver)
+        SigninPage(driver).load_signin_page()
+
     def locate_signin_button(self):
         """
         Locates and returns the 'Sign in' button element after waiting for it to be clickable.
         :return: WebElement for the 'Sign in' button
         """
-        return self.wait.until(EC.element_to_be_clickable(SigninPage.signin_button_locator))
+        return self.signin_button_element
 
     def locate_signin_tab(self):
         """
         Waits for the account overlay to be visible, then locates and returns the 'Sign in' tab element.
         :return: WebElement for the 'Sign in' tab
         """
-        self.wait.until(EC.visibility_of_element_located(SigninPage.account_overlay_locator))
-        signin_tab = self.wait.until(EC.element_to_be_clickable(SigninPage.signin_tab_locator))
-        return signin_tab
+        self.wait.until(Waits.element_visible(SigninPage.account_overlay_locator))
+        return self.signin_tab_element
 
     def load_signin_page(self):
         """
-        Loads the Sign In page by clicking on the 'Sign in' button and then clicking on the 'Sign in' tab.
+        Loads the Sign In page by clicking on the 'Sign in' button and then clicking on the 'Sign in' tab,
+        and waits for the login form to be shown.
 
         """
-        time.sleep(2)
+        self.wait.until(Waits.page_loaded())
         self.locate_signin_button().click()  # Click on the 'Sign in' button
         self.locate_signin_tab().click()  # Click on the 'Sign in' tab
+        self.login_element.element  # Resolve the lazy element so the login form is known to be shown
+        self.navigation.arrived(SigninPage, self.driver.current_url)
 
     def locate_login_button(self):
         """
-        Locates and returns the 'Login' button element.
+        Waits for the 'Login' button element to be visible and returns it.
         :return: WebElement for the 'Login' button
         """
-        return self.driver.find_element(*SigninPage.login_locator)
+        return self.login_element
 
     def locate_email_err(self):
         """
-        Locates and returns the email error message element.
+        Waits for the email error message element to be visible and returns it.
         :return: WebElement for the email error message
         """
-        return self.driver.find_element(*SigninPage.email_error_locator)
+        return self.email_error_element
 
     def locate_pass_err(self):
         """
-        Locates and returns the password error message element.
+        Waits for the password error message element to be visible and returns it.
         :return: WebElement for the password error message
         """
-        return self.driver.find_element(*SigninPage.pass_error_locator)
+        return self.pass_error_element
 
     def locate_pass_tab(self):
         """
-        Locates and returns the password input element.
+        Waits for the password input element to be visible and returns it.
         :return: WebElement for the password input
         """
-        return self.driver.find_element(*SigninPage.pass_tab_locator)
+        return self.pass_tab_element
 
     def locate_email_tab(self):
         """
-        Locates and returns the email input element.
+        Waits for the email input element to be visible and returns it.
         :return: WebElement for the email input
         """
-        return self.driver.find_element(*SigninPage.email_tab_locator)
+        return self.email_tab_element
 
     def locate_show_button(self):
         """
-        Locates and returns the 'Show' button for revealing the password.
+        Waits for the 'Show' button for revealing the password to be clickable and returns it.
         :return: WebElement for the 'Show' button
         """
-        return self.driver.find_element(*SigninPage.show_button_locator)
+        return self.show_button_element
 
     def locate_hide_button(self):
         """
-        Locates and returns the 'Hide' button for concealing the password.
+        Waits for the 'Hide' button for concealing the password to be clickable and returns it.
         :return: WebElement for the 'Hide' button
         """
-        return self.driver.find_element(*SigninPage.hide_button_locator)
+        return self.hide_button_element
 
     def locate_user_wish(self):
         """
-        Locates and returns the user wish element (possibly a greeting or message).
+        Waits for the user wish element (possibly a greeting or message) to be visible and returns it.
+        :return: WebElement for the user wish
+        """
+        return self.user_wish_element
+
+    def sign_in(self, email, password):
+        """
+        Signs in through the UI: opens the Sign In page, submits the credentials and waits for the user greeting.
+        :param email: Email or phone number of the account.
+        :param password: Password of the account.
         :return: WebElement for the user wish
         """
-        return self.driver.find_element(*SigninPage.user_wish_locator)
+        self.load_signin_page()
+        self.locate_email_tab().send_keys(email)
+        self.locate_pass_tab().send_keys(password)
+        self.locate_login_button().click()
+        greeting = self.user_wish_element.element
+        self.navigation.forget()  # The site takes the browser away from the login page
+        return greeting
+
+    def reset_form(self):
+        """
+        Clears the email and password fields in place, without reloading the page, and waits for
+        the error messages of the previous submission to go away, so the next data case only sees its own.
+        The login page is reloaded when the messages stay.
+        """
+        self.driver.execute_script(SigninPage.reset_form_script,
+                                   SigninPage.email_tab_locator[1], SigninPage.pass_tab_locator[1])
+        error_ids = (SigninPage.email_error_locator[1], SigninPage.pass_error_locator[1])
+        try:
+            Waits.waiter_for(self.driver, SigninPage.errors_cleared_timeout).until_not(
+                lambda driver: driver.execute_script(SigninPage.errors_shown_script, *error_ids))
+        except TimeoutException:
+            self.driver.refresh()  # The login page comes back with an empty form
+        self.__dict__.pop("_elements", None)  # Elements cached before the reset may have been replaced
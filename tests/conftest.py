@@ -1,36 +1,477 @@
+import json
+import os
 import time
+import warnings
 
 import pytest
-from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 
-driver = None
+from TestData.SigninPageData import SigninPageData
+from pageObjects import Navigation
+from pageObjects.HomePage import HomePage
+from pageObjects.SigninPage import SigninPage
+from utilities import DataStore, Instrumentation, Logs, RequestBlocking, Reruns, Resources, Scheduler, Screenshots, StreamReport, Trace, Waits, Workers
+from utilities.BrowserContexts import IsolatedContext
+from utilities.BrowserFactory import BrowserFactory
+from utilities.BrowserPool import BrowserPool
+from utilities.RemoteGrid import GridClient
+from utilities.SessionState import SessionState, origin_of
+from utilities.SiteArchive import ArchiveServer, SiteArchive
 
 
 def pytest_addoption(parser):
     parser.addoption(
         "--browser-name", action="store", default="chrome"
     )
+    parser.addoption(
+        "--headless", action="store_true", default=False,
+        help="launch browsers without a visible window"
+    )
+    parser.addoption(
+        "--page-load-strategy", action="store", default="normal", choices=["normal", "eager", "none"],
+        help="how long driver.get() waits: full load, DOM ready, or not at all"
+    )
+    parser.addoption(
+        "--window-size", action="store", default=None, metavar="WIDTHxHEIGHT",
+        help="fixed browser window size instead of maximizing, e.g. 1366x768"
+    )
+    parser.addoption(
+        "--browser-preset", action="store", default="default",
+        help="named set of browser arguments and preferences, e.g. 'fast' or 'ci'"
+    )
+    parser.addoption(
+        "--remote-url", action="store", default=None, metavar="URL",
+        help="start the browsers on a Selenium Grid or standalone server, e.g. http://localhost:4444; "
+             "commands share a keep-alive connection pool sized to the worker's browsers"
+    )
+    parser.addoption(
+        "--pool-size", action="store", type=int, default=1,
+        help="number of browsers launched up front and shared across test classes"
+    )
+    parser.addoption(
+        "--isolation", action="store", default="class", choices=["class", "test"],
+        help="'class' shares one browser window and its cookies within a test class; 'test' gives every test "
+             "a fresh isolated browser context (own cookies, storage and cache) inside the same browser"
+    )
+    parser.addoption(
+        "--workers", action="store", type=int, default=0,
+        help="run test classes in N parallel worker processes, each with its own browser"
+    )
+    parser.addoption(
+        "--scheduler", action="store", default="history", choices=["history", "collection"],
+        help="'history' runs smoke tests first and hands the longest test classes to workers first, "
+             "based on durations recorded in earlier runs; 'collection' keeps the collection order"
+    )
+    parser.addoption(
+        "--reruns", action="store", type=int, default=0,
+        help="rerun failed tests up to N times at the end of the run on the warm browsers; "
+             "tests passing on a rerun are recorded as flaky and quarantined"
+    )
+    parser.addoption(
+        "--quarantine", action="store", default="include", choices=["include", "exclude", "only"],
+        help="'include' runs quarantined flaky tests with the rest, 'exclude' leaves them out, "
+             "'only' runs just them as a separate lane"
+    )
+    parser.addoption(
+        "--data-shard", action="store", default=None, metavar="K/N",
+        help="run only the K-th of N deterministic shards of the data-driven test cases, e.g. 2/4"
+    )
+    parser.addoption(
+        "--site", action="store", default="https://www.target.com/",
+        help="URL of the site under test"
+    )
+    parser.addoption(
+        "--record", action="store", default=None, metavar="ARCHIVE",
+        help="serve the site through a local proxy that records every response into the ARCHIVE directory"
+    )
+    parser.addoption(
+        "--replay", action="store", default=None, metavar="ARCHIVE",
+        help="serve the site from a recorded ARCHIVE directory instead of the network"
+    )
+    parser.addoption(
+        "--block-profile", action="store", default=None, choices=sorted(RequestBlocking.profiles),
+        help="block requests the tests do not need (images, fonts, ads, trackers) while browsing"
+    )
+    parser.addoption(
+        "--block-url", action="append", default=[], metavar="PATTERN",
+        help="additional URL pattern to block, e.g. '*.gif' (may be repeated)"
+    )
+    parser.addoption(
+        "--timings", action="store_true", default=False,
+        help="time every WebDriver command, wait and sleep, and report a per-test breakdown"
+    )
+    parser.addoption(
+        "--trace-steps", action="store", type=int, default=0, metavar="N",
+        help="keep the last N WebDriver steps of each test (command, locator, URL, log lines and a downscaled "
+             "screenshot for actions) in memory and write them as a timeline when the test fails or xfails"
+    )
+    parser.addoption(
+        "--resource-monitor", action="store_true", default=False,
+        help="sample the memory and handles of the driver, browser and renderer processes (needs psutil) and "
+             "the JS heap around every test, flag tests that leak and reap leftover driver processes at the end"
+    )
+    parser.addoption(
+        "--leak-threshold", action="store", type=float, default=Resources.leak_rss_mb, metavar="MB",
+        help="process memory growth in MB over a single test flagged as a leak by --resource-monitor"
+    )
+    parser.addoption(
+        "--stream-report", action="store", default=None, metavar="DIR",
+        help="write a paginated HTML report to DIR while the tests run, with the details of each test "
+             "loaded on demand, e.g. reports/stream"
+    )
+    parser.addoption(
+        "--wait-poll", action="store", type=float, default=Waits.poll_frequency,
+        help="longest interval in seconds between two checks of a page object wait condition"
+    )
+    parser.addoption(
+        "--wait-mode", action="store", default="poll", choices=("poll", "event"),
+        help="'poll' re-checks wait conditions from the test process; 'event' has the page watch them with "
+             "DOM mutation and network listeners and answer one async script call, without implicit waits"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "smoke: quick check of a main flow, scheduled first by --scheduler history")
+    config.addinivalue_line("markers", "quarantine: flaky test set aside by the flake database, see --quarantine")
+    Waits.poll_frequency = config.getoption("--wait-poll")
+    Waits.mode = config.getoption("--wait-mode")
+    if Waits.mode == "event":
+        Waits.implicit_wait = 0
+    if not Workers.is_controller(config):  # The controller runs no tests, so it has nothing to log
+        Logs.start()
+    if config.getoption("--resource-monitor"):
+        config.stash[resource_monitor_key] = Resources.ResourceMonitor(config.getoption("--leak-threshold"))
+    if config.getoption("--scheduler") == "history" and not hasattr(config, "workerinput"):
+        history = Scheduler.DurationHistory.load(config)
+        config.pluginmanager.register(Scheduler.DurationRecorderPlugin(history), "duration-recorder")
+        if config.pluginmanager.hasplugin("xdist"):
+            config.pluginmanager.register(Scheduler.HistorySchedulerPlugin(history), "history-scheduler")
+    if config.getoption("--reruns") > 0:
+        config.pluginmanager.register(Reruns.RerunPlugin(config.getoption("--reruns")), "reruns")
+    if not hasattr(config, "workerinput"):
+        config.pluginmanager.register(Reruns.FlakeRecorderPlugin(Reruns.FlakeDatabase.load(config)), "flake-recorder")
+        if config.getoption("--stream-report"):
+            config.pluginmanager.register(StreamReport.StreamReportPlugin(config.getoption("--stream-report")),
+                                          "stream-report")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--scheduler") == "history":
+        Scheduler.reorder_items(items)
+    Reruns.apply_quarantine(config, items, Reruns.FlakeDatabase.load(config), config.getoption("--quarantine"))
+    if config.getoption("--data-shard"):
+        try:
+            shard = DataStore.parse_shard(config.getoption("--data-shard"))
+        except ValueError as error:
+            raise pytest.UsageError(str(error))
+        selected, deselected = [], []
+        for item in items:
+            cases = [value for value in getattr(getattr(item, "callspec", None), "params", {}).values()
+                     if isinstance(value, DataStore.Case)]
+            (selected if all(DataStore.in_shard(case, shard) for case in cases) else deselected).append(item)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+
+def pytest_unconfigure(config):
+    factory = config.stash.get(browser_factory_key, None)
+    if factory is not None and factory.grid is not None:
+        factory.grid.close()
+    Logs.stop()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    """
+    Translates --workers into a pytest-xdist run before xdist sets up distribution.
+    Test classes share one browser, so they are distributed as whole groups (loadscope).
+    """
+    workers = config.getoption("--workers")
+    if not workers or hasattr(config, "workerinput"):
+        return
+    if not config.pluginmanager.hasplugin("xdist"):
+        raise pytest.UsageError("--workers requires the pytest-xdist plugin")
+    config.option.numprocesses = workers
+    if config.option.dist == "no":
+        config.option.dist = "loadscope"
+
+
+browser_factory_key = pytest.StashKey()
+browser_pool_key = pytest.StashKey()
+timings_key = pytest.StashKey()
+trace_key = pytest.StashKey()
+resource_monitor_key = pytest.StashKey()
+reaped_key = pytest.StashKey()
+call_probes_key = pytest.StashKey()
+
+
+def _launch_browser(factory, blocked_urls=(), instrument=False, monitor=None):
+    """
+    Launches a new browser through the factory and applies the session-wide settings.
+    :param factory: BrowserFactory built from the command line options
+    :param blocked_urls: URL patterns the browser must not load
+    :param instrument: True to time every WebDriver command of the browser
+    :param monitor: ResourceMonitor sampling the browser's processes, or None
+    :return: WebDriver instance
+    """
+    browser = factory.launch()
+    if monitor is not None:
+        monitor.track(browser)
+    if instrument:
+        Instrumentation.instrument(browser)
+    if blocked_urls and not RequestBlocking.apply(browser, blocked_urls):
+        warnings.warn("Request blocking is only supported on Chromium browsers, loading everything on %s"
+                      % factory.browser_name)
+    browser.implicitly_wait(Waits.implicit_wait)
+    return browser
+
+
+@pytest.fixture(scope="session")
+def browser_factory(request):
+    """
+    Builds browser options from the command line and launches browsers with them.
+    """
+    config = request.config
+    if browser_factory_key in config.stash:
+        return config.stash[browser_factory_key]  # Set up again for the rerun stage
+    window_size = config.getoption("--window-size")
+    if window_size:
+        try:
+            window_size = tuple(int(value) for value in window_size.lower().split("x"))
+        except ValueError:
+            window_size = ()
+        if len(window_size) != 2:
+            raise pytest.UsageError("--window-size must look like 1366x768")
+    remote_url = config.getoption("--remote-url")
+    grid = GridClient(remote_url, config.getoption("--pool-size")) if remote_url else None
+    capabilities = {}
+    if _blocked_urls(config):
+        capabilities.update([RequestBlocking.chrome_logging_prefs()])
+    if config.getoption("--isolation") == "test":
+        if config.getoption("--browser-name") == "IE":
+            raise pytest.UsageError("--isolation test needs a Chromium or WebDriver BiDi browser")
+        if grid is not None or config.getoption("--browser-name") != "chrome":
+            capabilities["webSocketUrl"] = True  # BiDi user contexts, DevTools commands are local to Chromium
+    try:
+        factory = BrowserFactory(
+            config.getoption("--browser-name"),
+            headless=config.getoption("--headless"),
+            page_load_strategy=config.getoption("--page-load-strategy"),
+            window_size=window_size,
+            preset=config.getoption("--browser-preset"),
+            capabilities=capabilities,
+            grid=grid,
+        )
+    except ValueError as error:
+        raise pytest.UsageError(str(error))
+    config.stash[browser_factory_key] = factory
+    return factory
+
+
+@pytest.fixture(scope="session")
+def browser_pool(request, browser_factory):
+    """
+    Session-wide pool of warm browsers.
+    The pool outlives the fixture so the rerun stage after the last test reuses the same browsers;
+    it is shut down at the end of the session.
+    """
+    config = request.config
+    pool = config.stash.get(browser_pool_key, None)
+    if pool is None:
+        blocked_urls = _blocked_urls(config)
+        instrument = config.getoption("--timings") or config.getoption("--trace-steps") > 0
+        monitor = config.stash.get(resource_monitor_key, None)
+        pool = BrowserPool(lambda: _launch_browser(browser_factory, blocked_urls, instrument, monitor),
+                           config.getoption("--pool-size"), concurrent_start=browser_factory.grid is not None)
+        pool.start()
+        config.stash[browser_pool_key] = pool
+    return pool
+
+
+def _blocked_urls(config):
+    return RequestBlocking.patterns_for(config.getoption("--block-profile"), config.getoption("--block-url"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_context(request):
+    """
+    With --isolation test, runs each test in a fresh browser context of the test class's browser,
+    disposed of with its cookies, storage and cache when the test ends.
+    """
+    driver = getattr(request.cls, "driver", None)
+    if driver is None or request.config.getoption("--isolation") != "test":
+        yield
+        return
+    context = IsolatedContext(driver).open()
+    blocked_urls = _blocked_urls(request.config)
+    if blocked_urls:
+        RequestBlocking.apply(driver, blocked_urls)  # DevTools settings apply per tab
+    site_url = request.getfixturevalue("site_url")
+    request.getfixturevalue("browser_factory").navigate(driver, site_url)
+    Navigation.state_for(driver).start(site_url, HomePage)
+    yield context
+    Navigation.state_for(driver).forget()
+    context.close()
+
+
+@pytest.fixture(autouse=True)
+def resource_usage(request):
+    """
+    With --resource-monitor, records how much each test grew its browser's memory, handles and JS heap.
+    Defined after isolated_context so the test's own browser context is part of the starting point.
+    """
+    driver = getattr(request.cls, "driver", None)
+    monitor = request.config.stash.get(resource_monitor_key, None)
+    if driver is None or monitor is None:
+        return
+    before = monitor.sample(driver)
+
+    def probe(report):
+        delta, leaks = monitor.compare(before, monitor.sample(driver))
+        return [("resources", delta)] + ([("resource_leaks", leaks)] if leaks else [])
+    _add_call_probe(request, probe)
+
+
+@pytest.fixture(autouse=True)
+def request_counts(request):
+    """
+    Records how many requests the browser made and how many were blocked during each test.
+    """
+    driver = getattr(request.cls, "driver", None)
+    if driver is None or not _blocked_urls(request.config) or not hasattr(driver, "execute_cdp_cmd"):
+        return
+    RequestBlocking.count_requests(driver)  # Drop requests made before the test started
+
+    def probe(report):
+        allowed, blocked = RequestBlocking.count_requests(driver)
+        return [("requests_allowed", allowed), ("requests_blocked", blocked)]
+    _add_call_probe(request, probe)
+
+
+@pytest.fixture(autouse=True)
+def command_timings(request, monkeypatch):
+    """
+    Collects the WebDriver commands, waits and sleeps of each test on an instrumented driver, with --timings.
+    """
+    driver = getattr(request.cls, "driver", None)
+    recorder = Instrumentation.recorder_for(driver) if driver else None
+    if recorder is None:
+        yield
+        return
+    recorder.reset()  # Also without --timings, e.g. for --trace-steps, so the recorder never outgrows a test
+    if not request.config.getoption("--timings"):
+        yield
+        return
+    monkeypatch.setattr(time, "sleep", Instrumentation.timed_sleep(recorder, time.sleep))
+
+    def probe(report):
+        breakdown = recorder.breakdown()
+        breakdown["wall_time"] = round(report.duration, 4)
+        breakdown["outcome"] = report.outcome
+        request.config.stash.setdefault(timings_key, {})[request.node.nodeid] = breakdown
+        return [("command_timings", breakdown)]
+    _add_call_probe(request, probe)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def trace_steps(request):
+    """
+    Keeps the last --trace-steps steps of each test, written out by pytest_runtest_makereport on failure.
+    """
+    driver = getattr(request.cls, "driver", None)
+    recorder = Instrumentation.recorder_for(driver) if driver else None
+    size = request.config.getoption("--trace-steps")
+    if recorder is None or size <= 0:
+        yield
+        return
+    buffer = Trace.TraceBuffer(driver, recorder, size)
+    buffer.start()
+    request.node.stash[trace_key] = buffer
+    yield
+    buffer.stop()
+    del request.node.stash[trace_key]
+
+
+@pytest.fixture(scope="session")
+def site_url(request):
+    """
+    URL of the site under test: the live site, or a local archive server in record/replay mode.
+    """
+    record = request.config.getoption("--record")
+    replay = request.config.getoption("--replay")
+    if record and replay:
+        raise pytest.UsageError("--record and --replay cannot be used together")
+    if not (record or replay):
+        yield request.config.getoption("--site")
+        return
+    server = ArchiveServer(SiteArchive(record or replay), request.config.getoption("--site"), record=bool(record))
+    server.start()
+    yield server.url
+    server.stop()
 
 
 @pytest.fixture(scope="class")
-def setup(request):
-    global driver
-    browser_name = request.config.getoption("--browser-name")
-    if browser_name == "chrome":
-        driver = webdriver.Chrome()
-    elif browser_name == "firefox":
-        driver = webdriver.Firefox()
-    elif browser_name == "IE":
-        driver = webdriver.Ie
-    driver.implicitly_wait(5)
-    driver.get("https://www.target.com/")
-    driver.maximize_window()
+def setup(request, browser_pool, browser_factory, site_url):
+    driver = browser_pool.checkout()
+    if request.config.getoption("--isolation") == "class":
+        browser_factory.navigate(driver, site_url)
+        Navigation.state_for(driver).start(site_url, HomePage)
     request.cls.driver = driver
     yield
-    driver.close()
+    browser_pool.checkin(driver)
+
+
+@pytest.fixture(scope="session")
+def credentials():
+    """
+    Account of the valid sign-in tests, from the environment or the unversioned credentials file.
+    Tests needing it are skipped when none is configured.
+    :return: Dict with 'email', 'password' and the expected 'greeting'
+    """
+    values = DataStore.load_credentials(SigninPageData.credentials_file, SigninPageData.credentials_env)
+    if values is None:
+        pytest.skip("no sign-in account configured: set %s or create %s"
+                    % (", ".join(SigninPageData.credentials_env.values()), SigninPageData.credentials_file))
+    return values
+
+
+@pytest.fixture
+def signed_in(request, site_url, credentials):
+    """
+    Signs the test class's browser in with the configured account.
+    The first use in a run logs in through the UI and stores the session on disk; later uses
+    restore the stored cookies and storage until the login cookies expire.
+    :return: SigninPage on the signed-in site
+    """
+    driver = request.cls.driver
+    cache = getattr(request.config, "cache", None)
+    directory = str(cache.mkdir("session-state")) if cache else os.path.join(Workers.artifacts_root, "session-state")
+    store = SessionState(os.path.join(directory, "signed_in.json"))
+    signinPage = SigninPage(driver)
+    state = store.load(origin_of(site_url))
+    if state is not None:
+        SessionState.restore(driver, state, site_url)
+        Navigation.state_for(driver).arrived(HomePage, site_url)
+        try:
+            signinPage.locate_user_wish().element
+            return signinPage
+        except TimeoutException:
+            store.clear()  # Signed out on the server side, fall back to the UI login
+            signinPage = SigninPage(driver)
+    else:
+        driver.get(site_url)
+        Navigation.state_for(driver).arrived(HomePage, site_url)
+    cookies_before = {cookie["name"]: cookie["value"] for cookie in driver.get_cookies()}
+    signinPage.sign_in(credentials["email"], credentials["password"])
+    login_cookies = {cookie["name"] for cookie in driver.get_cookies()
+                     if cookies_before.get(cookie["name"]) != cookie["value"]}
+    store.save(SessionState.capture(driver, login_cookies))
+    return signinPage
 
 
 @pytest.mark.hookwrapper
@@ -44,18 +485,110 @@ def pytest_runtest_makereport(item):
     outcome = yield
     report = outcome.get_result()
     extra = getattr(report, 'extra', [])
+    if report.when == "call":
+        for probe in item.stash.get(call_probes_key, []):
+            report.user_properties.extend(probe(report))
+    if report.when != "setup":
+        item.stash[call_probes_key] = []  # Each attempt of a test registers its own probes
 
     if report.when == 'call' or report.when == "setup":
         xfail = hasattr(report, 'wasxfail')
-        if (report.skipped and xfail) or (report.failed and not xfail):
-            file_name = report.nodeid.replace("::", "_") + ".png"
-            _capture_screenshot(file_name)
-            if file_name:
-                html = '<div><img src="%s" alt="screenshot" style="width:304px;height:228px;" ' \
-                       'onclick="window.open(this.src)" align="right"/></div>' % file_name
+        driver = getattr(item.cls, "driver", None)
+        if driver and ((report.skipped and xfail) or (report.failed and not xfail)):
+            full_path, thumb_path = Screenshots.save(driver.get_screenshot_as_png())
+            report.user_properties.extend([("screenshot", full_path), ("thumbnail", thumb_path)])
+            if pytest_html:
+                html = '<div><a href="%s" target="_blank"><img src="%s" alt="screenshot" align="right"/></a></div>' % (
+                    _report_link(item.config, full_path), _report_link(item.config, thumb_path))
                 extra.append(pytest_html.extras.html(html))
+            buffer = item.stash.get(trace_key, None)
+            if buffer is not None:
+                trace_path = buffer.dump(item.nodeid, "xfailed" if xfail else "failed")
+                report.user_properties.append(("trace", trace_path))
+                if pytest_html:
+                    extra.append(pytest_html.extras.html('<div><a href="%s" target="_blank">Step trace</a></div>'
+                                                         % _report_link(item.config, trace_path)))
+        if report.when == "call" and pytest_html:
+            properties = dict(report.user_properties)
+            if "requests_blocked" in properties:
+                extra.append(pytest_html.extras.html(
+                    "<div>Requests: %(requests_allowed)d allowed, %(requests_blocked)d blocked</div>" % properties))
+            if "command_timings" in properties:
+                extra.append(pytest_html.extras.html(Instrumentation.breakdown_html(properties["command_timings"])))
+            if "resources" in properties:
+                extra.append(pytest_html.extras.html(
+                    Resources.delta_html(properties["resources"], properties.get("resource_leaks", []))))
         report.extra = extra
 
 
-def _capture_screenshot(name):
-    driver.get_screenshot_as_file(name)
+def pytest_terminal_summary(terminalreporter, config):
+    allowed = blocked = 0
+    leaks = []
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            if getattr(report, "when", None) == "call":
+                properties = dict(report.user_properties)
+                allowed += properties.get("requests_allowed", 0)
+                blocked += properties.get("requests_blocked", 0)
+                if "resource_leaks" in properties:
+                    leaks.append((report.nodeid, properties["resource_leaks"]))
+    if blocked:
+        terminalreporter.write_line("Requests: %d allowed, %d blocked" % (allowed, blocked))
+    if leaks:
+        terminalreporter.section("possible resource leaks")
+        for nodeid, descriptions in leaks:
+            terminalreporter.write_line("%s: %s" % (nodeid, "; ".join(descriptions)))
+    reaped = config.stash.get(reaped_key, None)
+    if reaped:
+        terminalreporter.write_line("Reaped %d leftover driver and browser processes" % len(reaped))
+    factory = config.stash.get(browser_factory_key, None)
+    if factory is not None and factory.launch_times:
+        metrics = factory.metrics()
+        terminalreporter.write_line(
+            "Browser launch: %(count)d in %(mean).2fs on average (max %(max).2fs)" % metrics["launch"])
+        if metrics["first_navigation"]["count"]:
+            terminalreporter.write_line(
+                "First navigation: %(mean).2fs on average (max %(max).2fs)" % metrics["first_navigation"])
+        grid = metrics.get("grid")
+        if grid and grid["round_trip"] is not None:
+            terminalreporter.write_line(
+                "Grid: %(requests)d commands in %(request_time).2fs, about %(network_overhead).2fs of it network "
+                "(%(round_trip).4fs round trip), %(connections_opened)d connections opened" % grid)
+
+
+def pytest_sessionfinish(session):
+    pool = session.config.stash.get(browser_pool_key, None)
+    if pool is not None:
+        pool.shutdown()
+    monitor = session.config.stash.get(resource_monitor_key, None)
+    if monitor is not None:
+        reaped = session.config.stash[reaped_key] = monitor.reap()
+        with open(os.path.join(Workers.worker_dir("metrics"), "resources.json"), "w") as file:
+            json.dump({"psutil": Resources.psutil is not None, "reaped": reaped}, file, indent=2)
+    Screenshots.flush()
+    factory = session.config.stash.get(browser_factory_key, None)
+    if factory is not None and factory.launch_times:
+        factory.write_metrics()
+    timings = session.config.stash.get(timings_key, None)
+    if timings:
+        with open(os.path.join(Workers.worker_dir("metrics"), "timings.json"), "w") as file:
+            json.dump(timings, file, indent=2)
+
+
+def _add_call_probe(request, probe):
+    """
+    Registers a measure of the running test, taken when its call phase ends so that it is reported
+    with the call report, the one the HTML report and the xdist controller show the test's details from.
+    :param probe: Callable receiving the call report and returning the (name, value) properties to add to it.
+    """
+    request.node.stash.setdefault(call_probes_key, []).append(probe)
+
+
+def _report_link(config, path):
+    """
+    Returns the path of an artifact relative to the HTML report, so links work wherever the report is opened.
+    """
+    html_path = getattr(config.option, "htmlpath", None)
+    if not html_path:
+        return path
+    return os.path.relpath(path, os.path.dirname(os.path.abspath(html_path))).replace(os.sep, "/")
@@ -0,0 +1,126 @@
+import json
+import os
+
+import pytest
+
+from utilities import DataStore
+from utilities.DataStore import Case, DataSet
+
+
+@pytest.fixture
+def rows():
+    return [{"email": "a@", "password": "1"}, {"email": "b@", "password": "2"}, {"email": "c@", "password": "3"}]
+
+
+@pytest.fixture
+def csv_file(tmp_path, rows):
+    path = tmp_path / "cases.csv"
+    path.write_text("email,password\n" + "".join("%(email)s,%(password)s\n" % row for row in rows))
+    return str(path)
+
+
+def _compiled_files(path):
+    directory = os.path.join(os.path.dirname(path), DataStore.cache_dir_name)
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+def test_parse_shard():
+    """
+    Test that shard specifications are parsed into a zero-based index and a count.
+    """
+    assert DataStore.parse_shard("1/4") == (0, 4)
+    assert DataStore.parse_shard("4/4") == (3, 4)
+
+
+@pytest.mark.parametrize("value", ["0/4", "5/4", "1", "1/2/3", "a/b", ""])
+def test_parse_shard_rejects_invalid(value):
+    """
+    Test that malformed and out of range shard specifications are rejected.
+    """
+    with pytest.raises(ValueError):
+        DataStore.parse_shard(value)
+
+
+def test_shards_partition_cases():
+    """
+    Test that every case runs in exactly one shard, the same one on every call.
+    """
+    cases = [Case(index, "case-%d" % index) for index in range(200)]
+    shards = [(index, 3) for index in range(3)]
+    for case in cases:
+        owners = [shard for shard in shards if DataStore.in_shard(case, shard)]
+        assert len(owners) == 1, "-E- %s runs in %d shards" % (case.key, len(owners))
+        assert DataStore.in_shard(case, owners[0])
+        assert DataStore.in_shard(case, None)
+    assert all(any(DataStore.in_shard(case, shard) for case in cases) for shard in shards), "-E- Empty shard"
+
+
+def test_csv_round_trip(csv_file, rows):
+    """
+    Test that rows read by index and by iteration match the source file.
+    """
+    dataset = DataSet(csv_file)
+    assert len(dataset) == len(rows)
+    assert [dataset[index] for index in range(len(rows))] == rows
+    assert list(dataset) == rows
+    assert dataset[Case(2, "c@")] == rows[2]
+
+
+def test_jsonl_round_trip(tmp_path, rows):
+    """
+    Test that JSON Lines files keep their value types and skip blank lines.
+    """
+    path = tmp_path / "cases.jsonl"
+    path.write_text("\n".join(json.dumps(dict(row, number=index)) for index, row in enumerate(rows)) + "\n\n")
+    dataset = DataSet(str(path))
+    assert list(dataset) == [dict(row, number=index) for index, row in enumerate(rows)]
+
+
+def test_cases_keys(csv_file):
+    """
+    Test that cases are named after the key field, or after their row number without one.
+    """
+    assert DataSet(csv_file, key="email").cases() == [Case(0, "a@"), Case(1, "b@"), Case(2, "c@")]
+    assert DataSet(csv_file).cases() == [Case(0, "0"), Case(1, "1"), Case(2, "2")]
+
+
+def test_compiled_form_reused(csv_file, rows):
+    """
+    Test that a second DataSet on an unchanged file reads the compiled form instead of compiling again.
+    """
+    DataSet(csv_file)[0]
+    compiled = _compiled_files(csv_file)
+    assert len(compiled) == 2, "-E- Expected a compiled file and its index"
+    mtimes = [os.stat(os.path.join(os.path.dirname(csv_file), DataStore.cache_dir_name, name)).st_mtime_ns
+              for name in compiled]
+    assert list(DataSet(csv_file)) == rows
+    assert _compiled_files(csv_file) == compiled
+    assert [os.stat(os.path.join(os.path.dirname(csv_file), DataStore.cache_dir_name, name)).st_mtime_ns
+            for name in compiled] == mtimes, "-E- Unchanged file was compiled again"
+
+
+def test_recompiled_on_change(csv_file, rows):
+    """
+    Test that editing the source file compiles it again and removes the stale compiled form.
+    """
+    assert list(DataSet(csv_file)) == rows
+    before = _compiled_files(csv_file)
+    with open(csv_file, "a") as file:
+        file.write("d@,4\n")
+    stat = os.stat(csv_file)
+    os.utime(csv_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+    dataset = DataSet(csv_file)
+    assert len(dataset) == len(rows) + 1
+    assert dataset[3] == {"email": "d@", "password": "4"}
+    after = _compiled_files(csv_file)
+    assert len(after) == 2 and not set(before) & set(after), "-E- Stale compiled form was kept"
+
+
+def test_unsupported_format(tmp_path):
+    """
+    Test that data files of unknown formats are rejected.
+    """
+    path = tmp_path / "cases.txt"
+    path.write_text("a@\n")
+    with pytest.raises(ValueError):
+        len(DataSet(str(path)))
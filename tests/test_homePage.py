@@ -1,4 +1,3 @@
-import time
 import pytest
 from TestData.HomePageData import HomePageData
 from TestData.SigninPageData import SigninPageData
@@ -37,7 +36,6 @@ class TestHomePage(BaseClass):
 
         log.info("Performing a search for an item")
         homePage.search_item()
-        time.sleep(2)
 
         log.info("Waiting for search results to be visible")
         homePage.locate_results()
@@ -53,10 +51,7 @@ class TestHomePage(BaseClass):
         homePage = HomePage(self.driver)
 
         log.info("Retrieving navbar contents for validation")
-        content_list = []
-        navbar_content = homePage.locate_navbar_contents()
-        for content in navbar_content:
-            content_list.append(content.text)
+        content_list = homePage.get_navbar_texts()
 
         log.info(f"Navbar content found: {content_list}")
         assert content_list == HomePageData.expected_header_content, "-E- Navigation items do not match expected content"
@@ -70,14 +65,13 @@ class TestHomePage(BaseClass):
 
         log.info("Navigating to the category dropdown")
         homePage.locate_home_icon().click()
-        time.sleep(2)
 
         log.info("Selecting the category dropdown")
         homePage.locate_category().click()
-        time.sleep(2)
 
         log.info("Selecting the 'Back to School' option from the dropdown")
         homePage.get_school_option().click()
+        homePage.wait_for_dom_stable()
 
         log.info("Verifying if the 'Back to School' content is present on the page")
         assert HomePageData.school_content in self.driver.page_source, "-E- 'Back to School' content not found in page source"
@@ -91,7 +85,6 @@ class TestHomePage(BaseClass):
 
         log.info("Navigating to the sign-in page")
         signinPage.load_signin_page()
-        time.sleep(2)
 
         log.info("Verifying the page title of the sign-in page")
         page_title = self.driver.title
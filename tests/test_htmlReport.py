@@ -0,0 +1,75 @@
+import html
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_html")
+
+# Root of the repository, put on the path of the inner run so it can load tests.conftest as a plugin
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tests run by the inner pytest: a class whose driver only takes screenshots, so no browser is needed
+fake_tests = '''
+import base64
+
+
+class FakeDriver:
+    png = base64.b64decode(
+        "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==")
+
+    def get_screenshot_as_png(self):
+        return self.png
+
+
+class TestFake:
+    driver = FakeDriver()
+
+    def test_passes(self):
+        pass
+
+    def test_fails(self):
+        assert False
+'''
+
+
+def _run_report(tmp_path, *options):
+    """
+    Runs the fake tests with the repository's conftest and returns the report's test data by node ID.
+    """
+    (tmp_path / "test_fake.py").write_text(fake_tests)
+    environment = dict(os.environ, PYTHONPATH=repo_root)
+    environment.pop("PYTEST_XDIST_WORKER", None)
+    subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-p", "tests.conftest",
+                    "--html=report.html", "--self-contained-html", "test_fake.py"] + list(options),
+                   cwd=str(tmp_path), env=environment, capture_output=True)
+    content = (tmp_path / "report.html").read_text(encoding="utf-8")
+    blob = re.search(r'data-jsonblob="([^"]*)"', content)
+    assert blob, "-E- The report carries no test data"
+    return json.loads(html.unescape(blob.group(1)))["tests"]
+
+
+def _extras(tests, name):
+    nodeid = "test_fake.py::TestFake::" + name
+    return "".join(extra["content"] for result in tests[nodeid] for extra in result.get("extras", []))
+
+
+def test_failure_screenshot_attached(tmp_path):
+    """
+    Test that a failing test shows its screenshot thumbnail in the HTML report.
+    """
+    tests = _run_report(tmp_path)
+    assert 'alt="screenshot"' in _extras(tests, "test_fails"), "-E- Screenshot missing from the failed test"
+    assert 'alt="screenshot"' not in _extras(tests, "test_passes"), "-E- Passed test has a screenshot"
+
+
+def test_per_test_details_attached(tmp_path):
+    """
+    Test that the details measured around each test are shown with the test in the HTML report.
+    """
+    tests = _run_report(tmp_path, "--resource-monitor")
+    for name in ("test_passes", "test_fails"):
+        assert "Resources:" in _extras(tests, name), "-E- Resource usage missing from %s" % name
@@ -1,8 +1,6 @@
-import time
 import pytest
 
 from TestData.ShopPageData import ShopPageData
-from pageObjects.HomePage import HomePage
 from pageObjects.ShopPage import ShopPage
 from utilities.BaseClass import BaseClass
 
@@ -23,11 +21,9 @@ class TestShopPage(BaseClass):
         shopPage = ShopPage(self.driver)
 
         log.info("Clicking on the cart icon")
-        time.sleep(2)
         shopPage.locate_cart().click()
 
         log.info("Verifying the cart message indicates it is empty")
-        time.sleep(2)
         cart_msg = shopPage.locate_cart_msg().text
         assert cart_msg == ShopPageData.empty_cart_msg, "-E- Cart is not showing empty as expected"
 
@@ -37,31 +33,23 @@ class TestShopPage(BaseClass):
         and that the item appears in the cart.
         """
         log = self.getLogger()
-        homePage = HomePage(self.driver)
-        # shopPage = ShopPage(self.driver)
 
-        log.info("Refreshing the page to ensure we start from a clean state")
-        self.driver.refresh()
-
-        log.info("Searching for the item to add to the cart")
-        shopPage = homePage.search_item()
+        log.info("Making sure the search results are shown")
+        shopPage = ShopPage.ensure(self.driver)
 
         log.info("Adding the first item to the cart")
-        time.sleep(2)
         shopPage.locate_add_cart().click()
 
         log.info("Handling the overlay after adding the item to the cart")
-        time.sleep(2)
         shopPage.locate_overlay_add().click()
 
         log.info("Clicking the checkout button to proceed")
         shopPage.locate_checkout().click()
-        time.sleep(2)
+        shopPage.wait_for_network_idle()
         log.info("Refreshing the page before checking the cart")
         self.driver.refresh()
 
         log.info("Clicking on the cart icon to verify the added item")
-        time.sleep(2)
         shopPage.locate_cart().click()
 
         item_count = shopPage.locate_items().text
@@ -73,30 +61,24 @@ class TestShopPage(BaseClass):
         Test to verify if the user can remove an item from the cart.
         """
         log = self.getLogger()
-        homePage = HomePage(self.driver)
-        # shopPage = ShopPage(self.driver)
 
-        log.info("Searching for the item to add to the cart")
-        shopPage = homePage.search_item()
-        time.sleep(2)
+        log.info("Making sure the search results are shown")
+        shopPage = ShopPage.ensure(self.driver)
 
         log.info("Adding the item to the cart")
         shopPage.locate_add_cart().click()
-        time.sleep(2)
 
         add_button_text = shopPage.locate_overlay_add().text
         shopPage.locate_overlay_add().click()
-        time.sleep(2)
 
         if add_button_text != "Add to cart":
             log.info("Item has been already added to the cart. Select the total number.")
             shopPage.locate_number().click()
+            shopPage.wait_for_network_idle()  # The new quantity must reach the server before the reload
             self.driver.refresh()
-            time.sleep(2)
             shopPage.locate_cart().click()
         else:
             log.info("Item was successfully added to the cart. Proceeding to checkout.")
-            time.sleep(2)
             shopPage.locate_checkout().click()
 
         log.info("Removing all items from the cart")
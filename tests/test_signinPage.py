@@ -1,4 +1,3 @@
-import time
 import pytest
 from TestData.HomePageData import HomePageData
 from TestData.SigninPageData import SigninPageData
@@ -44,10 +43,9 @@ class TestSigninPage(BaseClass):
         returns an error message for the missing email.
         """
         log = self.getLogger()
-        signinPage = SigninPage(self.driver)
 
-        log.info("Refreshing the page content")
-        self.driver._switch_to.default_content()
+        log.info("Making sure the Sign In form is shown")
+        signinPage = SigninPage.ensure(self.driver)
 
         log.info("Entering the dummy password")
         signinPage.locate_pass_tab().send_keys(SigninPageData.dummy_password)
@@ -63,23 +61,23 @@ class TestSigninPage(BaseClass):
         """
         Test to verify that submitting the login form with invalid email and password
         returns the appropriate error message for invalid email format.
+        Every data case reuses the loaded form instead of reloading the page.
         """
         log = self.getLogger()
-        signinPage = SigninPage(self.driver)
 
-        log.info("Refreshing the page content")
-        self.driver.refresh()
+        log.info("Making sure the Sign In form is shown")
+        signinPage = SigninPage.ensure(self.driver)
+
+        log.info("Resetting the login form in place")
+        signinPage.reset_form()
 
         log.info("Entering the invalid email")
-        time.sleep(2)
         signinPage.locate_email_tab().send_keys(get_data["inval_email"])
 
         log.info("Entering the invalid password")
-        time.sleep(2)
         signinPage.locate_pass_tab().send_keys(get_data["inval_pass"])
 
         log.info("Clicking the login button")
-        time.sleep(2)
         signinPage.locate_login_button().click()
 
         log.info("Retrieving the invalid email error message")
@@ -91,7 +89,9 @@ class TestSigninPage(BaseClass):
         Test to verify that the password field masks the password input.
         """
         log = self.getLogger()
-        signinPage = SigninPage(self.driver)
+
+        log.info("Making sure the Sign In form is shown")
+        signinPage = SigninPage.ensure(self.driver)
 
         log.info("Entering the dummy password")
         signinPage.locate_pass_tab().send_keys(SigninPageData.dummy_password)
@@ -105,14 +105,15 @@ class TestSigninPage(BaseClass):
         Test to verify that the show and hide buttons for the password work as expected.
         """
         log = self.getLogger()
-        signinPage = SigninPage(self.driver)
 
-        log.info("Refreshing the page content")
-        self.driver.refresh()
+        log.info("Making sure the Sign In form is shown")
+        signinPage = SigninPage.ensure(self.driver)
+
+        log.info("Resetting the login form in place")
+        signinPage.reset_form()
 
         log.info("Entering the dummy password")
         signinPage.locate_pass_tab().send_keys(SigninPageData.dummy_password)
-        time.sleep(2)
 
         log.info("Clicking the show button to reveal the password")
         signinPage.locate_show_button().click()
@@ -122,44 +123,58 @@ class TestSigninPage(BaseClass):
         assert pass_type == SigninPageData.show_pass_type, "-E- Show button did not reveal the password"
 
         log.info("Clicking the hide button to hide the password")
-        time.sleep(2)
         signinPage.locate_hide_button().click()
 
         log.info("Checking if the password is hidden")
         pass_type = signinPage.locate_pass_tab().get_attribute("type")
-        time.sleep(2)
         assert pass_type == SigninPageData.hide_pass_type, "-E- Hide button did not conceal the password"
 
-    def test_valid_signin(self):
+    def test_valid_signin(self, credentials):
         """
         Test to verify that signing in with valid credentials successfully logs the user in.
         """
         log = self.getLogger()
-        signinPage = SigninPage(self.driver)
 
-        log.info("Refreshing the page content")
-        self.driver.refresh()
-        time.sleep(2)
+        log.info("Making sure the Sign In form is shown")
+        signinPage = SigninPage.ensure(self.driver)
+
+        log.info("Resetting the login form in place")
+        signinPage.reset_form()
 
         log.info("Entering the valid email")
-        signinPage.locate_email_tab().send_keys(SigninPageData.valid_email)
+        signinPage.locate_email_tab().send_keys(credentials["email"])
 
         log.info("Entering the valid password")
-        time.sleep(2)
-        signinPage.locate_pass_tab().send_keys(SigninPageData.valid_pass)
+        signinPage.locate_pass_tab().send_keys(credentials["password"])
 
         log.info("Clicking the login button")
-        time.sleep(2)
         signinPage.locate_login_button().click()
 
         log.info("Retrieving the user greeting message")
-        time.sleep(4)
         msg_displayed = signinPage.locate_user_wish().text
-        assert msg_displayed == SigninPageData.expected_msg, "-E- User greeting message is not displayed correctly"
+        assert msg_displayed == credentials["greeting"], "-E- User greeting message is not displayed correctly"
 
-    @pytest.fixture(params=SigninPageData.invalid_email_set)
+    @pytest.fixture(params=SigninPageData.invalid_email_set.cases(), ids=lambda case: case.key)
     def get_data(self, request):
         """
         Fixture to provide test data for invalid email and password combinations.
+        Each case only carries its row number; the row is read when the test runs.
         """
-        return request.param
+        return SigninPageData.invalid_email_set[request.param]
+
+
+class TestSignedInSession(BaseClass):
+    """
+    Test suite for a user who is already signed in.
+    The session is restored from the stored snapshot instead of going through the login form.
+    """
+
+    def test_restored_session_greeting(self, signed_in, credentials):
+        """
+        Test to verify that the signed-in user is greeted by name.
+        """
+        log = self.getLogger()
+
+        log.info("Retrieving the user greeting message")
+        msg_displayed = signed_in.locate_user_wish().text
+        assert msg_displayed == credentials["greeting"], "-E- User greeting message is not displayed correctly"
@@ -0,0 +1,103 @@
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utilities.SiteArchive import ArchiveServer, SiteArchive
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    """
+    Stands in for the real site: a page linking to itself and to a script on another host.
+    """
+
+    page = (b'<html><script src="https://cdn.example.com/app.js"></script><a href="http://%s/next">next</a>'
+            b'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"></svg></html>')
+
+    def do_GET(self):
+        body = self.page % self.headers["Host"].encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d/" % httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read().decode()
+
+
+def test_record_then_replay_on_another_port(site, tmp_path):
+    """
+    Test that a page recorded on one port points at the replay server when served on another.
+    """
+    recorder = ArchiveServer(SiteArchive(str(tmp_path)), site, record=True)
+    recorder.start()
+    recorded_url = recorder.url
+    recorded = _get(recorded_url)
+    recorder.stop()
+
+    replayer = ArchiveServer(SiteArchive(str(tmp_path)), site)
+    replayer.start()
+    try:
+        replayed_url = replayer.url
+        assert replayed_url != recorded_url, "-E- Replay should bind a new port"
+        replayed = _get(replayed_url)
+    finally:
+        replayer.stop()
+
+    local = replayed_url.split("/")[2]
+    assert "http://%s/__host__/cdn.example.com/app.js" % local in replayed, "-E- Script URL not served locally"
+    assert "http://%s/next" % local in replayed, "-E- Site link not served locally"
+    assert recorded_url.split("/")[2] not in replayed, "-E- Replayed page still points at the recording port"
+    assert recorded.replace(recorded_url.split("/")[2], local) == replayed
+
+
+def test_archive_keeps_upstream_body(site, tmp_path):
+    """
+    Test that the archive stores the body as the site served it.
+    """
+    recorder = ArchiveServer(SiteArchive(str(tmp_path)), site, record=True)
+    recorder.start()
+    _get(recorder.url)
+    recorder.stop()
+
+    status, headers, body = SiteArchive(str(tmp_path)).lookup(SiteArchive.key("GET", "/"))
+    assert status == 200
+    assert b"https://cdn.example.com/app.js" in body, "-E- Archived body was rewritten"
+
+
+def test_namespace_uris_not_rewritten(site, tmp_path):
+    """
+    Test that XML namespace URIs are served as recorded, so SVG and XHTML elements keep their namespace.
+    """
+    recorder = ArchiveServer(SiteArchive(str(tmp_path)), site, record=True)
+    recorder.start()
+    recorded = _get(recorder.url)
+    recorder.stop()
+
+    replayer = ArchiveServer(SiteArchive(str(tmp_path)), site)
+    replayer.start()
+    try:
+        replayed = _get(replayer.url)
+    finally:
+        replayer.stop()
+
+    for page in (recorded, replayed):
+        assert 'xmlns="http://www.w3.org/2000/svg"' in page, "-E- SVG namespace was rewritten"
+        assert 'xmlns:xlink="http://www.w3.org/1999/xlink"' in page, "-E- XLink namespace was rewritten"
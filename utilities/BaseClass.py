@@ -1,19 +1,12 @@
 import pytest
-import logging
-import inspect
+
+from utilities import Logs
 
 @pytest.mark.usefixtures("setup")
 class BaseClass:
-    def getLogger(self):
-        loggerName = inspect.stack()[1][3]
-        logger = logging.getLogger(loggerName)
-        fileHandler = logging.FileHandler('logfile.log')
-        formatter = logging.Formatter("%(asctime)s :%(levelname)s : %(name)s :%(message)s")
-        fileHandler.setFormatter(formatter)
-
-        logger.addHandler(fileHandler)  # filehandler object
-
-        logger.setLevel(logging.DEBUG)
-        return logger
-
+    @pytest.fixture(autouse=True)
+    def _bind_node(self, request):
+        self.nodeid = request.node.nodeid
 
+    def getLogger(self):
+        return Logs.get_logger(self.nodeid)
@@ -0,0 +1,163 @@
+"""
+Suite benchmark harness.
+
+Runs the selected tests several times with --timings, collects wall time, WebDriver command
+count and time spent waiting or sleeping per test, and compares the result with a stored baseline.
+Best run against a replayed site so the network does not dominate the numbers:
+
+    python -m utilities.Benchmark --runs 5 --baseline bench/baseline.json -- tests/test_homePage.py --replay archive/
+    python -m utilities.Benchmark --runs 5 --save-baseline bench/baseline.json -- tests/test_homePage.py --replay archive/
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+
+from utilities import Workers
+
+# Metrics compared against the baseline, read from the per-test breakdown of utilities.Instrumentation
+metrics = {
+    "wall_time": lambda breakdown: breakdown.get("wall_time", 0.0),
+    "commands": lambda breakdown: breakdown["commands"],
+    "idle_time": lambda breakdown: breakdown["wait_time"] + breakdown["sleep_time"],
+}
+# Smallest absolute growth per metric that can count as a regression, so tiny tests do not trip the gate
+min_deltas = {"wall_time": 0.25, "commands": 1, "idle_time": 0.25}
+
+
+def run_suite(pytest_args):
+    """
+    Runs pytest once with command timing enabled.
+    :param pytest_args: Arguments passed to pytest.
+    :return: Tuple (pytest exit code, dict of test node ID to breakdown)
+    """
+    for path in glob.glob(os.path.join(Workers.artifacts_root, "metrics", "*", "timings.json")):
+        os.remove(path)
+    completed = subprocess.run([sys.executable, "-m", "pytest", "--timings", "-q"] + list(pytest_args))
+    timings = {}
+    for path in glob.glob(os.path.join(Workers.artifacts_root, "metrics", "*", "timings.json")):
+        with open(path) as file:
+            timings.update(json.load(file))
+    return completed.returncode, timings
+
+
+def collect(runs, pytest_args):
+    """
+    Runs the suite several times and gathers every sample per test and metric.
+    Only tests that passed give samples: a failing test's timings say nothing about its speed.
+    :param runs: Number of runs.
+    :param pytest_args: Arguments passed to pytest.
+    :return: Results dict {"runs": runs, "exit_codes": [code per run], "tests": {nodeid: {metric: [samples]}}}
+    """
+    tests = {}
+    exit_codes = []
+    for run in range(runs):
+        print("Benchmark run %d/%d" % (run + 1, runs))
+        exit_code, timings = run_suite(pytest_args)
+        exit_codes.append(exit_code)
+        for nodeid, breakdown in timings.items():
+            if breakdown.get("outcome") != "passed":
+                continue
+            samples = tests.setdefault(nodeid, {name: [] for name in metrics})
+            for name, read in metrics.items():
+                samples[name].append(read(breakdown))
+    return {"runs": runs, "exit_codes": exit_codes, "tests": tests}
+
+
+def compare(results, baseline, threshold, sigmas, min_delta):
+    """
+    Compares results with a baseline.
+    A metric regresses when its mean grew by more than `threshold` (relative), by more than
+    `sigmas` standard errors of the difference, and by more than `min_delta` (absolute).
+    :return: List of (nodeid, metric, baseline mean, current mean) for every regression
+    """
+    regressions = []
+    for nodeid, samples in sorted(results["tests"].items()):
+        base_samples = baseline["tests"].get(nodeid)
+        if base_samples is None:
+            continue
+        for name in metrics:
+            current, base = samples.get(name), base_samples.get(name)
+            if not current or not base:
+                continue
+            current_mean, base_mean = statistics.mean(current), statistics.mean(base)
+            delta = current_mean - base_mean
+            error = math.sqrt(_variance(current) / len(current) + _variance(base) / len(base))
+            if delta > threshold * base_mean and delta > sigmas * error and delta > min_delta.get(name, 0):
+                regressions.append((nodeid, name, base_mean, current_mean))
+    return regressions
+
+
+def missing(results, baseline):
+    """
+    Lists the baseline tests without a single passing sample in the results, e.g. because they
+    errored, were skipped or were not collected.
+    :return: Sorted list of node IDs
+    """
+    return sorted(nodeid for nodeid in baseline["tests"] if not results["tests"].get(nodeid, {}).get("wall_time"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utilities.Benchmark", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="number of suite runs (default 5)")
+    parser.add_argument("--results", default=os.path.join(Workers.artifacts_root, "benchmark.json"),
+                        help="file the collected samples are written to")
+    parser.add_argument("--baseline", help="baseline file to compare against")
+    parser.add_argument("--save-baseline", metavar="PATH", help="store the collected samples as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative growth of a mean tolerated before it counts as a regression (default 0.10)")
+    parser.add_argument("--sigmas", type=float, default=2.0,
+                        help="standard errors the growth must exceed to be significant (default 2)")
+    parser.add_argument("pytest_args", nargs="*", help="arguments passed to pytest, after --")
+    options = parser.parse_args(argv)
+
+    results = collect(options.runs, options.pytest_args)
+    _write(options.results, results)
+    _print_summary(results)
+    failed_runs = [code for code in results["exit_codes"] if code != 0]
+    if failed_runs:
+        print("FAILED %d of %d runs did not pass (pytest exit codes %s), results are not comparable"
+              % (len(failed_runs), options.runs, ", ".join(str(code) for code in failed_runs)))
+        return 1
+    if options.save_baseline:
+        _write(options.save_baseline, results)
+    if not options.baseline:
+        return 0
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    absent = missing(results, baseline)
+    for nodeid in absent:
+        print("MISSING %s: in the baseline but without a passing sample" % nodeid)
+    regressions = compare(results, baseline, options.threshold, options.sigmas, min_deltas)
+    for nodeid, name, base_mean, current_mean in regressions:
+        print("REGRESSION %s %s: %.3f -> %.3f" % (nodeid, name, base_mean, current_mean))
+    if regressions or absent:
+        return 1
+    print("No regression against %s" % options.baseline)
+    return 0
+
+
+def _variance(samples):
+    return statistics.variance(samples) if len(samples) > 1 else 0.0
+
+
+def _write(path, results):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+def _print_summary(results):
+    for nodeid, samples in sorted(results["tests"].items()):
+        print("%s: %s" % (nodeid, ", ".join(
+            "%s %.3f" % (name, statistics.mean(values)) for name, values in samples.items() if values)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+from selenium.common.exceptions import WebDriverException
+
+
+def supported(driver):
+    """
+    Tells whether isolated contexts can be opened in a browser: through DevTools on local
+    Chromium browsers, through WebDriver BiDi user contexts on sessions started with webSocketUrl.
+    :param driver: WebDriver instance.
+    :return: True when IsolatedContext works on the driver
+    """
+    return hasattr(driver, "execute_cdp_cmd") or bool(getattr(driver, "caps", {}).get("webSocketUrl"))
+
+
+class IsolatedContext:
+    """
+    Fresh browser context opened in a running browser: a tab with its own cookies, storage and cache,
+    like an incognito window. Opening and disposing of one takes milliseconds where a new browser takes seconds.
+    """
+
+    def __init__(self, driver):
+        """
+        Initializes the IsolatedContext.
+        :param driver: WebDriver instance of the running browser.
+        """
+        self.driver = driver
+        self.context_id = None
+        self.handle = None
+        self._opener = None
+
+    def open(self):
+        """
+        Creates the context with a blank tab and switches the driver to it.
+        :return: The IsolatedContext
+        """
+        driver = self.driver
+        self._opener = driver.current_window_handle
+        handles = set(driver.window_handles)
+        if hasattr(driver, "execute_cdp_cmd"):
+            self.context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+            target = driver.execute_cdp_cmd("Target.createTarget",
+                                            {"url": "about:blank", "browserContextId": self.context_id})
+            self.handle = target["targetId"]
+        elif supported(driver):
+            self.context_id = driver.browser.create_user_context()
+            self.handle = driver.browsing_context.create(type="tab", user_context=self.context_id)
+        else:
+            raise WebDriverException("Isolated contexts need a Chromium browser or a WebDriver BiDi session")
+        if self.handle not in handles and self.handle not in driver.window_handles:
+            # Drivers naming windows differently from the protocol's target IDs
+            self.handle = (set(driver.window_handles) - handles).pop()
+        driver.switch_to.window(self.handle)
+        return self
+
+    def close(self):
+        """
+        Closes the tab, disposes of the context with everything it stored, and switches back to the opener.
+        """
+        driver = self.driver
+        try:
+            driver.close()
+        finally:
+            driver.switch_to.window(self._opener)
+            if hasattr(driver, "execute_cdp_cmd"):
+                driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": self.context_id})
+            else:
+                driver.browser.remove_user_context(self.context_id)
@@ -0,0 +1,191 @@
+import json
+import os
+import statistics
+import time
+import weakref
+
+from selenium import webdriver
+
+from utilities import Workers
+
+# Extra command line arguments and preferences per browser and preset name
+presets = {
+    "chrome": {
+        "default": {"args": [], "prefs": {}},
+        "fast": {
+            "args": [
+                "--disable-extensions", "--no-first-run", "--no-default-browser-check",
+                "--disable-default-apps", "--disable-background-networking", "--disable-sync",
+                "--disable-component-update", "--disable-search-engine-choice-screen",
+                "--disable-features=Translate,OptimizationHints,MediaRouter", "--mute-audio",
+            ],
+            "prefs": {"credentials_enable_service": False, "profile.password_manager_enabled": False},
+        },
+        "ci": {
+            "args": [
+                "--disable-extensions", "--no-first-run", "--no-default-browser-check",
+                "--disable-default-apps", "--disable-background-networking", "--disable-sync",
+                "--disable-component-update", "--disable-search-engine-choice-screen", "--mute-audio",
+                "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu",
+            ],
+            "prefs": {"credentials_enable_service": False, "profile.password_manager_enabled": False},
+        },
+    },
+    "firefox": {
+        "default": {"args": [], "prefs": {}},
+        "fast": {
+            "args": [],
+            "prefs": {
+                "browser.shell.checkDefaultBrowser": False,
+                "browser.startup.homepage_override.mstone": "ignore",
+                "datareporting.policy.dataSubmissionEnabled": False,
+                "toolkit.telemetry.reportingpolicy.firstRun": False,
+                "app.update.auto": False,
+                "extensions.update.enabled": False,
+                "media.autoplay.default": 5,
+            },
+        },
+    },
+    "IE": {
+        "default": {"args": [], "prefs": {}},
+    },
+}
+presets["firefox"]["ci"] = presets["firefox"]["fast"]
+
+# Window size used in headless mode when none is given, maximizing has no meaning there
+default_headless_size = (1920, 1080)
+
+
+class BrowserFactory:
+    """
+    Builds browser options from the command line settings and launches browsers with them.
+    Records how long each launch and each browser's first navigation took.
+    """
+
+    def __init__(self, browser_name, headless=False, page_load_strategy="normal", window_size=None,
+                 preset="default", capabilities=None, grid=None):
+        """
+        Initializes the BrowserFactory.
+        :param browser_name: 'chrome', 'firefox' or 'IE'.
+        :param headless: True to launch browsers without a visible window.
+        :param page_load_strategy: 'normal', 'eager' or 'none'.
+        :param window_size: (width, height) tuple, or None to maximize the window.
+        :param preset: Name of the argument preset in `presets` for this browser.
+        :param capabilities: Extra capabilities to set on the options.
+        :param grid: RemoteGrid.GridClient to start the browsers on, or None for local browsers.
+        """
+        if browser_name not in presets:
+            raise ValueError("Unsupported browser: %s" % browser_name)
+        if preset not in presets[browser_name]:
+            raise ValueError("Unknown preset %r for %s, expected one of %s"
+                             % (preset, browser_name, ", ".join(presets[browser_name])))
+        self.browser_name = browser_name
+        self.headless = headless
+        self.page_load_strategy = page_load_strategy
+        self.window_size = window_size or (default_headless_size if headless else None)
+        self.preset = preset
+        self.capabilities = dict(capabilities or {})
+        self.grid = grid
+        self.launch_times = []
+        self.first_navigation_times = []
+        self._navigated = weakref.WeakSet()
+
+    def options(self):
+        """
+        Builds the options object passed to the WebDriver constructor.
+        :return: ChromeOptions, FirefoxOptions or IeOptions
+        """
+        preset = presets[self.browser_name][self.preset]
+        if self.browser_name == "chrome":
+            options = webdriver.ChromeOptions()
+            if self.headless:
+                options.add_argument("--headless=new")
+            if self.window_size:
+                options.add_argument("--window-size=%d,%d" % self.window_size)
+            if preset["prefs"]:
+                options.add_experimental_option("prefs", preset["prefs"])
+        elif self.browser_name == "firefox":
+            options = webdriver.FirefoxOptions()
+            if self.headless:
+                options.add_argument("-headless")
+            if self.window_size:
+                options.add_argument("--width=%d" % self.window_size[0])
+                options.add_argument("--height=%d" % self.window_size[1])
+            for name, value in preset["prefs"].items():
+                options.set_preference(name, value)
+        else:
+            options = webdriver.IeOptions()
+        for argument in preset["args"]:
+            options.add_argument(argument)
+        options.page_load_strategy = self.page_load_strategy
+        for name, value in self.capabilities.items():
+            options.set_capability(name, value)
+        return options
+
+    def launch(self):
+        """
+        Launches a browser and sizes its window.
+        :return: WebDriver instance
+        """
+        options = self.options()
+        start = time.perf_counter()
+        if self.grid is not None:
+            driver = webdriver.Remote(command_executor=self.grid.connection(), options=options)
+        elif self.browser_name == "chrome":
+            driver = webdriver.Chrome(options=options)
+        elif self.browser_name == "firefox":
+            driver = webdriver.Firefox(options=options)
+        else:
+            driver = webdriver.Ie(options=options)
+        if self.window_size is None:
+            driver.maximize_window()
+        elif self.browser_name == "IE":
+            driver.set_window_size(*self.window_size)
+        self.launch_times.append(time.perf_counter() - start)
+        return driver
+
+    def navigate(self, driver, url):
+        """
+        Opens a URL, recording the duration when it is the browser's first navigation.
+        :param driver: WebDriver instance launched by this factory.
+        :param url: URL to open.
+        """
+        start = time.perf_counter()
+        driver.get(url)
+        if driver not in self._navigated:
+            self._navigated.add(driver)
+            self.first_navigation_times.append(time.perf_counter() - start)
+
+    def metrics(self):
+        """
+        Summarizes the recorded startup timings.
+        :return: Dict with count, mean and max seconds for 'launch' and 'first_navigation',
+                 and the grid's command and network metrics for remote browsers
+        """
+        metrics = {
+            "browser": self.browser_name,
+            "headless": self.headless,
+            "page_load_strategy": self.page_load_strategy,
+            "preset": self.preset,
+            "launch": _summary(self.launch_times),
+            "first_navigation": _summary(self.first_navigation_times),
+        }
+        if self.grid is not None:
+            metrics["grid"] = self.grid.metrics()
+        return metrics
+
+    def write_metrics(self):
+        """
+        Writes the startup timings of this worker to reports/metrics/<worker>/browser.json.
+        :return: Path of the written file
+        """
+        path = os.path.join(Workers.worker_dir("metrics"), "browser.json")
+        with open(path, "w") as file:
+            json.dump(self.metrics(), file, indent=2)
+        return path
+
+
+def _summary(values):
+    if not values:
+        return {"count": 0, "mean": None, "max": None}
+    return {"count": len(values), "mean": round(statistics.mean(values), 3), "max": round(max(values), 3)}
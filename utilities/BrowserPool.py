@@ -0,0 +1,115 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import WebDriverException
+
+
+class BrowserPool:
+    """
+    Session-wide pool of pre-launched WebDriver instances.
+    Drivers are checked out by a test class, reset when they are checked back in
+    and shut down with quit() when the pool is closed.
+    """
+
+    # Clears storage of the current origin; pages like about:blank raise a SecurityError
+    clear_storage_script = """
+        try { window.localStorage.clear(); } catch (e) {}
+        try { window.sessionStorage.clear(); } catch (e) {}
+    """
+
+    def __init__(self, factory, size=1, concurrent_start=False):
+        """
+        Initializes the pool.
+        :param factory: Callable returning a freshly launched WebDriver instance.
+        :param size: Number of browsers to launch up front.
+        :param concurrent_start: True to request the initial browsers all at once, e.g. from a grid
+                                 starting them on several nodes, instead of one after the other.
+        """
+        self.factory = factory
+        self.size = size
+        self.concurrent_start = concurrent_start
+        self._idle = []
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Launches the initial set of browsers.
+        """
+        missing = self.size - len(self._drivers)
+        if self.concurrent_start and missing > 1:
+            with ThreadPoolExecutor(missing) as executor:
+                drivers = list(executor.map(lambda _: self._launch(), range(missing)))
+        else:
+            drivers = [self._launch() for _ in range(missing)]
+        with self._lock:
+            self._idle.extend(drivers)
+
+    def checkout(self):
+        """
+        Hands out an idle browser, launching a new one when the pool is exhausted.
+        :return: WebDriver instance reserved for the caller
+        """
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._launch()
+
+    def checkin(self, driver):
+        """
+        Resets the browser and returns it to the pool.
+        Browsers that cannot be reset are quit and dropped from the pool.
+        :param driver: WebDriver instance previously returned by checkout()
+        """
+        try:
+            self.reset(driver)
+        except WebDriverException:
+            self._discard(driver)
+            return
+        with self._lock:
+            self._idle.append(driver)
+
+    def reset(self, driver):
+        """
+        Brings a browser back to a clean state: a single window, no cookies and empty web storage.
+        :param driver: WebDriver instance to reset
+        """
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.execute_script(BrowserPool.clear_storage_script)
+        if hasattr(driver, "execute_cdp_cmd"):
+            # Chromium can drop the cookies of every domain in one command
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        else:
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def shutdown(self):
+        """
+        Quits every browser launched by the pool, including ones still checked out.
+        """
+        with self._lock:
+            drivers, self._drivers, self._idle = self._drivers, [], []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+
+    def _launch(self):
+        driver = self.factory()
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
@@ -0,0 +1,189 @@
+import array
+import csv
+import glob
+import hashlib
+import json
+import os
+import zlib
+from collections import namedtuple
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional, only needed for .yaml/.yml data files
+    yaml = None
+
+# Directory next to the data files holding their compiled form
+cache_dir_name = "__datacache__"
+
+# Reference to one row of a DataSet, used as parameter value so collection never holds the rows
+Case = namedtuple("Case", ["index", "key"])
+
+
+class DataSet:
+    """
+    Rows of test data kept in an external JSON, JSON Lines, CSV or YAML file.
+    Nothing is read until the rows are needed. The first read compiles the file into JSON Lines plus
+    an index of row offsets, stored in __datacache__ and reused until the source changes; rows are
+    then read one at a time, so large files never have to be held in memory.
+    """
+
+    def __init__(self, path, key=None):
+        """
+        Initializes the DataSet.
+        :param path: Path of the data file; the format is taken from its extension.
+        :param key: Field naming each row in test IDs, defaults to the row number.
+        """
+        self.path = path
+        self.key = key
+        self._offsets = None
+        self._compiled_path = None
+
+    def __len__(self):
+        return len(self._index())
+
+    def __getitem__(self, index):
+        """
+        Reads one row.
+        :param index: Row number, or a Case.
+        :return: Dict of field name to value
+        """
+        if isinstance(index, Case):
+            index = index.index
+        offsets = self._index()
+        with open(self._compiled_path, "rb") as file:
+            file.seek(offsets[index])
+            return json.loads(file.readline())
+
+    def __iter__(self):
+        """
+        Streams the rows in file order.
+        """
+        self._index()
+        with open(self._compiled_path, "rb") as file:
+            for line in file:
+                yield json.loads(line)
+
+    def cases(self):
+        """
+        Lists a Case per row, to parametrize a fixture or test with: each test receives a Case
+        and reads its row with dataset[case] when it runs.
+        :return: List of Case
+        """
+        if self.key is None:
+            return [Case(index, str(index)) for index in range(len(self))]
+        return [Case(index, str(row.get(self.key, index))) for index, row in enumerate(self)]
+
+    def _index(self):
+        if self._offsets is None:
+            self._compiled_path, index_path = self._compile()
+            offsets = array.array("Q")
+            with open(index_path, "rb") as file:
+                offsets.frombytes(file.read())
+            self._offsets = offsets
+        return self._offsets
+
+    def _compile(self):
+        """
+        Compiles the source file unless a compiled form of its current version exists.
+        :return: Tuple (compiled JSON Lines path, offset index path)
+        """
+        stat = os.stat(self.path)
+        fingerprint = hashlib.sha256(
+            ("%s|%d|%d" % (os.path.abspath(self.path), stat.st_mtime_ns, stat.st_size)).encode()).hexdigest()[:16]
+        directory = os.path.join(os.path.dirname(os.path.abspath(self.path)), cache_dir_name)
+        base = os.path.join(directory, "%s-%s" % (os.path.basename(self.path), fingerprint))
+        compiled_path, index_path = base + ".jsonl", base + ".idx"
+        if os.path.exists(compiled_path) and os.path.exists(index_path):
+            return compiled_path, index_path
+        os.makedirs(directory, exist_ok=True)
+        offsets = array.array("Q")
+        # Written under temporary names and renamed, so parallel workers never read a partial file
+        suffix = ".%d.tmp" % os.getpid()
+        with open(compiled_path + suffix, "wb") as file:
+            for row in _read_rows(self.path):
+                offsets.append(file.tell())
+                file.write(json.dumps(row, ensure_ascii=False).encode("utf-8") + b"\n")
+        with open(index_path + suffix, "wb") as file:
+            file.write(offsets.tobytes())
+        os.replace(index_path + suffix, index_path)
+        os.replace(compiled_path + suffix, compiled_path)
+        for stale in glob.glob(glob.escape(os.path.join(directory, os.path.basename(self.path))) + "-*"):
+            if not stale.startswith(base) and not stale.endswith(".tmp"):
+                try:
+                    os.remove(stale)
+                except OSError:  # Removed by another worker, or still in use
+                    pass
+        return compiled_path, index_path
+
+
+def in_shard(case, shard):
+    """
+    Tells whether a case belongs to a shard. Cases are assigned by a stable hash of their key,
+    so every process and every run splits a DataSet the same way.
+    :param case: Case.
+    :param shard: Tuple (shard index, shard count), or None for no sharding.
+    :return: True when the case runs in the shard
+    """
+    if shard is None:
+        return True
+    index, count = shard
+    return zlib.crc32(case.key.encode("utf-8")) % count == index
+
+
+def parse_shard(value):
+    """
+    Parses a shard specification such as '2/4' (the second of four shards).
+    :return: Tuple (zero-based shard index, shard count)
+    """
+    try:
+        number, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError("Shard must look like 1/4, got %r" % value)
+    if not 1 <= number <= count:
+        raise ValueError("Shard %r is out of range" % value)
+    return number - 1, count
+
+
+def load_credentials(path, environment):
+    """
+    Reads secrets that must not live in source: environment variables first, then a local file
+    kept out of version control.
+    :param path: JSON file with the values, e.g. {"email": ..., "password": ...}.
+    :param environment: Dict of value name to environment variable overriding it.
+    :return: Dict of values, or None when any of them is missing
+    """
+    values = {}
+    if os.path.exists(path):
+        with open(path) as file:
+            values = json.load(file)
+    for name, variable in environment.items():
+        if os.environ.get(variable):
+            values[name] = os.environ[variable]
+    if any(not values.get(name) for name in environment):
+        return None
+    return values
+
+
+def _read_rows(path):
+    """
+    Streams the rows of a source file; JSON arrays and YAML documents are parsed whole.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        with open(path, newline="", encoding="utf-8") as file:
+            yield from csv.DictReader(file)
+    elif extension == ".jsonl":
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+    elif extension == ".json":
+        with open(path, encoding="utf-8") as file:
+            yield from json.load(file)
+    elif extension in (".yaml", ".yml"):
+        if yaml is None:
+            raise ImportError("PyYAML is required to read %s" % path)
+        with open(path, encoding="utf-8") as file:
+            yield from yaml.safe_load(file) or []
+    else:
+        raise ValueError("Unsupported test data format: %s" % path)
@@ -0,0 +1,172 @@
+import heapq
+import threading
+import time
+import weakref
+
+# Number of slowest commands kept in a test's breakdown
+slowest_count = 5
+
+_recorders = weakref.WeakKeyDictionary()
+
+
+class CommandRecorder:
+    """
+    Times every WebDriver command sent by a driver by hooking its execute() method,
+    and collects the explicit waits and sleeps reported to it.
+    Listeners added to `listeners` are called with (command, params, duration, response) after every
+    command; response is None when the command raised.
+    """
+
+    def __init__(self, driver):
+        """
+        Installs the hook on the driver.
+        :param driver: WebDriver instance to instrument.
+        """
+        self._execute = driver.execute
+        driver.execute = self._timed_execute
+        self.listeners = []
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets everything recorded so far, e.g. at the start of a test.
+        """
+        self.commands = []
+        self.waits = []
+        self.sleeps = []
+
+    def _timed_execute(self, command, params=None):
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self._execute(command, params)
+            return response
+        finally:
+            duration = time.perf_counter() - start
+            self.commands.append({"command": command, "locator": locator_of(params), "duration": duration})
+            for listener in self.listeners:
+                listener(command, params, duration, response)
+
+    def record_wait(self, condition, duration, satisfied):
+        """
+        Records an explicit wait.
+        :param condition: Name of the awaited condition.
+        :param duration: Seconds spent waiting.
+        :param satisfied: False when the wait timed out.
+        """
+        self.waits.append({"condition": condition, "duration": duration, "satisfied": satisfied})
+
+    def record_sleep(self, duration):
+        """
+        Records a time.sleep call made by the test.
+        :param duration: Seconds slept.
+        """
+        self.sleeps.append(duration)
+
+    def breakdown(self):
+        """
+        Summarizes what was recorded since the last reset().
+        :return: Dict with command count and wire time, waits, sleeps and the slowest commands
+        """
+        by_command = {}
+        for entry in self.commands:
+            totals = by_command.setdefault(entry["command"], {"count": 0, "time": 0.0})
+            totals["count"] += 1
+            totals["time"] += entry["duration"]
+        slowest = heapq.nlargest(slowest_count, self.commands, key=lambda entry: entry["duration"])
+        return {
+            "commands": len(self.commands),
+            "wire_time": _round(sum(entry["duration"] for entry in self.commands)),
+            "waits": len(self.waits),
+            "wait_time": _round(sum(wait["duration"] for wait in self.waits)),
+            "wait_timeouts": sum(1 for wait in self.waits if not wait["satisfied"]),
+            "sleeps": len(self.sleeps),
+            "sleep_time": _round(sum(self.sleeps)),
+            "slowest": [dict(entry, duration=_round(entry["duration"])) for entry in slowest],
+            "by_command": {name: {"count": totals["count"], "time": _round(totals["time"])}
+                           for name, totals in sorted(by_command.items())},
+        }
+
+
+def instrument(driver):
+    """
+    Returns the recorder of a driver, installing it on first use.
+    :param driver: WebDriver instance.
+    :return: CommandRecorder
+    """
+    recorder = _recorders.get(driver)
+    if recorder is None:
+        recorder = _recorders[driver] = CommandRecorder(driver)
+    return recorder
+
+
+def recorder_for(driver):
+    """
+    Returns the recorder of a driver without installing one.
+    :return: CommandRecorder, or None when the driver is not instrumented
+    """
+    try:
+        return _recorders.get(driver)
+    except TypeError:  # Objects that cannot be weakly referenced are never instrumented
+        return None
+
+
+def timed_sleep(recorder, sleep):
+    """
+    Wraps a sleep function so every call made on the calling thread, the test's, is reported to the recorder.
+    Sleeps of background threads (screenshot writer, log listener, grid connections) are not the test's.
+    :param recorder: CommandRecorder receiving the sleeps.
+    :param sleep: Original sleep function.
+    :return: Replacement for time.sleep
+    """
+    thread = threading.get_ident()
+
+    def _sleep(seconds):
+        if threading.get_ident() != thread:
+            return sleep(seconds)
+        start = time.perf_counter()
+        try:
+            sleep(seconds)
+        finally:
+            recorder.record_sleep(time.perf_counter() - start)
+    return _sleep
+
+
+def breakdown_html(breakdown):
+    """
+    Renders a test's breakdown as an HTML fragment for the report.
+    :param breakdown: Dict from CommandRecorder.breakdown().
+    :return: HTML string
+    """
+    rows = "".join(
+        "<tr><td>%s</td><td>%s</td><td>%.3fs</td></tr>" % (_escape(entry["command"]), _escape(entry["locator"] or ""),
+                                                            entry["duration"])
+        for entry in breakdown["slowest"])
+    return (
+        "<div><p>WebDriver: %(commands)d commands, %(wire_time).3fs on the wire; "
+        "waits: %(waits)d, %(wait_time).3fs; sleeps: %(sleeps)d, %(sleep_time).3fs</p>" % breakdown
+        + "<table><tr><th>Slowest command</th><th>Locator</th><th>Duration</th></tr>%s</table></div>" % rows
+    )
+
+
+def locator_of(params):
+    """
+    Describes what a command targets, for reports.
+    :param params: Parameters of the WebDriver command.
+    :return: 'strategy=value' for element lookups, the URL for navigations, otherwise None
+    """
+    if not params:
+        return None
+    if "using" in params and "value" in params:
+        return "%s=%s" % (params["using"], params["value"])
+    if "url" in params:
+        return params["url"]
+    return None
+
+
+def _round(seconds):
+    return round(seconds, 4)
+
+
+def _escape(text):
+    return str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
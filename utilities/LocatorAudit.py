@@ -0,0 +1,249 @@
+"""
+Locator audit.
+
+Lists every locator defined on the page objects, flags the fragile ones (generated styled-component
+class names, exact class matches, document-wide positional XPaths), times each of them against page
+snapshots and suggests a faster and stabler alternative, ranked worst first:
+
+    python -m utilities.LocatorAudit
+    python -m utilities.LocatorAudit --snapshot snapshots/home.html --snapshot https://www.target.com/s?searchTerm=bag
+
+A snapshot is a saved page (e.g. driver.page_source written to a file) or a URL, such as the one
+of a --replay archive server. Without snapshots only the static checks run.
+"""
+import argparse
+import json
+import os
+import pathlib
+import re
+import sys
+
+from selenium.webdriver.common.by import By
+
+from pageObjects.BasePage import BasePage
+from pageObjects.HomePage import HomePage
+from pageObjects.ShopPage import ShopPage
+from pageObjects.SigninPage import SigninPage
+from utilities import Workers
+
+# Page objects whose locators are audited
+pages = [HomePage, ShopPage, SigninPage]
+
+# Class names generated by styled-components change whenever the site is rebuilt: component IDs
+# such as 'sc-cfda7d4b-0' and the style hash following them, such as 'fUeOuH' or 'idfyjy'
+component_class = re.compile(r"^sc-[0-9a-f]{6,10}-\d+$")
+style_hash_class = re.compile(r"^[A-Za-z]{5,7}$")
+# IDs generated per render by React's useId(), such as 'overlay-:Rjkmuqlm:'
+generated_id = re.compile(r":[A-Za-z0-9]+:")
+# Attributes trusted to stay stable across releases, best first
+stable_attributes = ["data-test", "aria-label", "name"]
+# Points added to a locator's rank per finding
+weights = {"no-match": 5, "hashed-class": 4, "generated-id": 4, "positional": 3, "class-equals": 2, "many-matches": 1, "xpath": 1}
+
+# Times each locator over a number of runs and describes its first match for the suggestions
+audit_script = BasePage.find_elements_script + """
+    var locators = arguments[0], runs = arguments[1], stable = arguments[2];
+    function count(selector) {
+        try { return document.querySelectorAll(selector).length; } catch (e) { return 0; }
+    }
+    function describe(el) {
+        var attributes = {};
+        stable.forEach(function (name) {
+            var value = el.getAttribute(name);
+            if (value) { attributes[name] = {value: value, matches: count('[' + name + '="' + CSS.escape(value) + '"]')}; }
+        });
+        var ancestor = el.parentElement;
+        while (ancestor && !ancestor.hasAttribute('data-test')) { ancestor = ancestor.parentElement; }
+        return {
+            tag: el.tagName.toLowerCase(),
+            id: el.id || null,
+            id_matches: el.id ? count('#' + CSS.escape(el.id)) : 0,
+            attributes: attributes,
+            classes: Array.prototype.slice.call(el.classList),
+            text: (el.innerText || '').trim().slice(0, 60),
+            scope: ancestor ? {value: ancestor.getAttribute('data-test'), tag: el.tagName.toLowerCase()} : null
+        };
+    }
+    return locators.map(function (locator) {
+        var nodes = [], start = performance.now();
+        try {
+            for (var i = 0; i < runs; i++) { nodes = findAll(locator[0], locator[1]); }
+        } catch (e) {
+            return {error: String(e)};
+        }
+        return {
+            time_ms: (performance.now() - start) / runs,
+            matches: nodes.length,
+            first: nodes.length ? describe(nodes[0]) : null
+        };
+    });
+"""
+
+
+def collect_locators(page_classes=None):
+    """
+    Lists the (By, value) locator tuples defined on the page objects.
+    :param page_classes: Page object classes, defaults to `pages`.
+    :return: List of dicts with 'name' ('Page.attribute'), 'by' and 'value'
+    """
+    strategies = {value for name, value in vars(By).items() if name.isupper()}
+    locators = []
+    for page in page_classes or pages:
+        for name, value in vars(page).items():
+            if isinstance(value, tuple) and len(value) == 2 and value[0] in strategies:
+                locators.append({"name": "%s.%s" % (page.__name__, name), "by": value[0], "value": value[1]})
+    return locators
+
+
+def static_findings(by, value):
+    """
+    Checks a locator for fragile constructs without a browser.
+    :return: List of (kind, message) tuples
+    """
+    findings = []
+    hashed = _hashed_classes(_class_names(by, value))
+    if hashed:
+        findings.append(("hashed-class", "generated class names %s change with every site build" % ", ".join(hashed)))
+    if generated_id.search(value) and (by == By.ID or re.search(r"@id\s*=|#", value)):
+        findings.append(("generated-id", "IDs generated by React's useId() differ between renders"))
+    if by == By.XPATH:
+        if re.search(r"@class\s*=", value):
+            findings.append(("class-equals", "@class= only matches the exact class attribute, any added class breaks it"))
+        if re.search(r"^\(\s*//.*\)\[\d+\]$", value) or re.match(r"^//[\w*]+\[\d+\]", value):
+            findings.append(("positional", "document-wide positional XPath depends on the order of unrelated elements"))
+        if not findings and suggest(by, value, None) is not None:  # e.g. text() matches have no CSS equivalent
+            findings.append(("xpath", "XPath is evaluated slower than an equivalent CSS selector"))
+    return findings
+
+
+def suggest(by, value, first):
+    """
+    Proposes a stabler locator for the element a locator matched.
+    Prefers a unique ID, then a unique stable attribute, then a stable attribute scoped by the closest
+    data-test ancestor, then a CSS translation of the locator without generated class names.
+    :param first: Description of the first match from audit_script, or None when nothing matched.
+    :return: (By, value) tuple, or None when there is nothing better to offer
+    """
+    if first:
+        if first["id"] and first["id_matches"] == 1 and not generated_id.search(first["id"]):
+            return None if by == By.ID else (By.ID, first["id"])
+        for name in stable_attributes:
+            attribute = first["attributes"].get(name)
+            if attribute and attribute["matches"] == 1:
+                return By.CSS_SELECTOR, "%s[%s='%s']" % (first["tag"], name, attribute["value"])
+        if first["scope"]:
+            return By.CSS_SELECTOR, "[data-test='%s'] %s" % (first["scope"]["value"], first["scope"]["tag"])
+    names = _class_names(by, value)
+    classes = [name for name in names if name not in _hashed_classes(names)]
+    match = re.match(r"^//([\w-]+)\[@class\s*=\s*'([^']*)'\]$", value) if by == By.XPATH else None
+    if match and classes:
+        return By.CSS_SELECTOR, match.group(1) + "".join("." + name for name in classes)
+    match = re.match(r"^//([\w-]+)\[@([\w-]+)\s*=\s*'([^']*)'\]$", value) if by == By.XPATH else None
+    if match and match.group(2) not in ("class", "id"):
+        return By.CSS_SELECTOR, "%s[%s='%s']" % match.groups()
+    return None
+
+
+def audit(locators, driver=None, snapshots=(), runs=20):
+    """
+    Audits locators, timing them against each snapshot when a driver is given.
+    A locator is measured on the snapshot where it matched most elements.
+    :param locators: List from collect_locators().
+    :param driver: WebDriver instance used to load the snapshots, or None for static checks only.
+    :param snapshots: URLs or paths of saved pages.
+    :param runs: Times each locator is evaluated per snapshot to average its duration.
+    :return: List of result dicts, ranked worst first
+    """
+    measured = [{} for _ in locators]
+    for snapshot in snapshots if driver else ():
+        driver.get(_snapshot_url(snapshot))
+        rows = driver.execute_script(audit_script, [[entry["by"], entry["value"]] for entry in locators],
+                                     runs, stable_attributes)
+        for best, row in zip(measured, rows):
+            if "error" not in row and row["matches"] >= best.get("matches", 0):
+                best.update(row, snapshot=snapshot)
+    results = []
+    for entry, row in zip(locators, measured):
+        findings = static_findings(entry["by"], entry["value"])
+        if snapshots and driver and not row.get("matches"):
+            findings.append(("no-match", "matched nothing in any snapshot"))
+        elif row.get("matches", 0) > 1:
+            findings.append(("many-matches", "matched %d elements" % row["matches"]))
+        suggestion = suggest(entry["by"], entry["value"], row.get("first")) if findings else None
+        results.append(dict(
+            entry,
+            time_ms=round(row["time_ms"], 4) if "time_ms" in row else None,
+            matches=row.get("matches"),
+            snapshot=row.get("snapshot"),
+            findings=[{"kind": kind, "message": message} for kind, message in findings],
+            score=sum(weights[kind] for kind, message in findings),
+            suggestion=list(suggestion) if suggestion else None,
+        ))
+    results.sort(key=lambda result: (-result["score"], -(result["time_ms"] or 0)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utilities.LocatorAudit", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--snapshot", action="append", default=[],
+                        help="saved page or URL the locators are timed against (repeatable)")
+    parser.add_argument("--browser-name", default="chrome", help="browser loading the snapshots (default chrome)")
+    parser.add_argument("--runs", type=int, default=20, help="evaluations per locator and snapshot (default 20)")
+    parser.add_argument("--report", default=os.path.join(Workers.artifacts_root, "locator_audit.json"),
+                        help="file the ranked report is written to")
+    options = parser.parse_args(argv)
+
+    driver = None
+    if options.snapshot:
+        from utilities.BrowserFactory import BrowserFactory
+        driver = BrowserFactory(options.browser_name, headless=True).launch()
+    try:
+        results = audit(collect_locators(), driver, options.snapshot, options.runs)
+    finally:
+        if driver is not None:
+            driver.quit()
+    directory = os.path.dirname(options.report)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(options.report, "w") as file:
+        json.dump(results, file, indent=2)
+    _print_report(results)
+    print("Report written to %s" % options.report)
+    return 0
+
+
+def _class_names(by, value):
+    if by == By.CLASS_NAME:
+        return [value]
+    if by == By.CSS_SELECTOR:
+        return re.findall(r"\.([\w-]+)", value) + [name for group in re.findall(r"class\s*=\s*['\"]([^'\"]*)", value)
+                                                   for name in group.split()]
+    if by == By.XPATH:
+        return [name for group in re.findall(r"@class\s*=\s*['\"]([^'\"]*)", value) for name in group.split()]
+    return []
+
+
+def _hashed_classes(names):
+    generated = any(component_class.match(name) for name in names)
+    return [name for name in names if component_class.match(name) or (generated and style_hash_class.match(name))
+            or (style_hash_class.match(name) and re.search(r"[A-Z]", name[1:]) and re.search(r"[a-z]", name))]
+
+
+def _snapshot_url(snapshot):
+    if re.match(r"^[a-z]+:", snapshot):
+        return snapshot
+    return pathlib.Path(snapshot).resolve().as_uri()
+
+
+def _print_report(results):
+    for rank, result in enumerate(results, 1):
+        timing = "%.3fms, %s matches" % (result["time_ms"], result["matches"]) if result["time_ms"] is not None else "not timed"
+        print("%2d. [%d] %s  %s=%s  (%s)" % (rank, result["score"], result["name"], result["by"], result["value"], timing))
+        for finding in result["findings"]:
+            print("      - %s" % finding["message"])
+        if result["suggestion"]:
+            print("      suggestion: %s=%s" % tuple(result["suggestion"]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
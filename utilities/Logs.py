@@ -0,0 +1,62 @@
+import logging
+import logging.handlers
+import os
+import queue
+
+from utilities import Workers
+
+# Size in bytes at which the log file is rotated, and number of rotated files kept
+max_bytes = 5 * 1024 * 1024
+backup_count = 3
+
+log_format = "%(asctime)s :%(levelname)s : %(nodeid)s :%(message)s"
+
+# Logger shared by every test; each test's records carry its node ID instead of having a logger of their own
+_logger = logging.getLogger("tests")
+_logger.setLevel(logging.DEBUG)
+_queue_handler = None
+_listener = None
+
+
+def start(path=None):
+    """
+    Sets up the log pipeline once per process: loggers put records on a queue and a
+    background thread writes them to a size-bounded, rotating log file.
+    :param path: Log file path, defaults to logfile.log in the worker's log directory.
+    """
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+    if path is None:
+        path = os.path.join(Workers.worker_dir("logs"), "logfile.log")
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(logging.Formatter(log_format))
+    records = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(records)
+    _listener = logging.handlers.QueueListener(records, file_handler)
+    _listener.start()
+    _logger.addHandler(_queue_handler)
+
+
+def stop():
+    """
+    Flushes pending records and stops the background writer.
+    """
+    global _queue_handler, _listener
+    if _listener is None:
+        return
+    _logger.removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _queue_handler = _listener = None
+
+
+def get_logger(nodeid):
+    """
+    Returns the logger of a test: the shared test logger, tagging each record with the test's pytest node ID.
+    :param nodeid: pytest node ID of the test.
+    :return: LoggerAdapter writing to the shared log file through the queue
+    """
+    start()
+    return logging.LoggerAdapter(_logger, {"nodeid": nodeid})
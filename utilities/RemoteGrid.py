@@ -0,0 +1,133 @@
+import statistics
+import threading
+import time
+
+import urllib3
+from selenium.webdriver.remote.client_config import ClientConfig
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+# Seconds a single command may take on the server, session creation included (grids queue new sessions)
+command_timeout = 300
+# GET /status round trips timed to estimate the network share of each command
+probe_samples = 5
+
+
+class GridClient:
+    """
+    Keep-alive HTTP connection pool to a Selenium Grid or standalone server, shared by every
+    remote browser of the process, which also times the commands sent through it.
+    Each command's network overhead is estimated from the round trip of the server's status
+    endpoint, which answers without involving a browser.
+    """
+
+    def __init__(self, remote_url, pool_size=1):
+        """
+        Initializes the GridClient.
+        :param remote_url: Address of the grid, e.g. http://localhost:4444.
+        :param pool_size: Connections kept open, one per browser of the process using the grid at once.
+        """
+        self.remote_url = remote_url.rstrip("/")
+        self.pool_size = max(pool_size, 1)
+        self.manager = urllib3.PoolManager(
+            num_pools=1, maxsize=self.pool_size, block=False,
+            timeout=urllib3.Timeout(connect=10, read=command_timeout),
+            # Only failed connects are retried: commands are not idempotent, and redirects are followed by Selenium
+            retries=urllib3.Retry(connect=2, read=0, redirect=0, status=0, other=0, raise_on_redirect=False),
+        )
+        self.commands = {}
+        self.round_trip = None
+        self._lock = threading.Lock()
+
+    def connection(self):
+        """
+        Builds the command executor of a new remote browser.
+        :return: GridConnection sending its commands through the shared pool
+        """
+        return GridConnection(self)
+
+    def record(self, command, duration):
+        with self._lock:
+            totals = self.commands.setdefault(command, {"count": 0, "time": 0.0})
+            totals["count"] += 1
+            totals["time"] += duration
+
+    def probe(self):
+        """
+        Measures the network round trip to the grid as the median duration of GET /status.
+        :return: Seconds, or None when the grid does not answer
+        """
+        durations = []
+        for _ in range(probe_samples):
+            start = time.perf_counter()
+            try:
+                self.manager.request("GET", self.remote_url + "/status").release_conn()
+            except urllib3.exceptions.HTTPError:
+                return None
+            durations.append(time.perf_counter() - start)
+        self.round_trip = statistics.median(durations)
+        return self.round_trip
+
+    def connections_opened(self):
+        """
+        Counts the TCP connections opened to the grid so far; with keep-alive this stays near pool_size.
+        """
+        return self.manager.connection_from_url(self.remote_url).num_connections
+
+    def metrics(self):
+        """
+        Summarizes the commands sent to the grid.
+        :return: Dict with request count and time, connections opened, the measured round trip
+                 and the estimated network overhead in total and per command
+        """
+        if self.round_trip is None:
+            self.probe()
+        round_trip = self.round_trip or 0.0
+        with self._lock:
+            commands = {name: dict(totals) for name, totals in self.commands.items()}
+        requests = sum(totals["count"] for totals in commands.values())
+        request_time = sum(totals["time"] for totals in commands.values())
+        return {
+            "url": self.remote_url,
+            "pool_size": self.pool_size,
+            "connections_opened": self.connections_opened(),
+            "requests": requests,
+            "request_time": round(request_time, 3),
+            "round_trip": round(self.round_trip, 4) if self.round_trip is not None else None,
+            "network_overhead": round(min(requests * round_trip, request_time), 3),
+            "by_command": {
+                name: {"count": totals["count"], "time": round(totals["time"], 3),
+                       "network_share": round(min(1.0, totals["count"] * round_trip / totals["time"]), 3)
+                       if totals["time"] else None}
+                for name, totals in sorted(commands.items())
+            },
+        }
+
+    def close(self):
+        """
+        Closes the pooled connections, once every browser using them has quit.
+        """
+        self.manager.clear()
+
+
+class GridConnection(RemoteConnection):
+    """
+    Command executor of one remote browser, sending its requests through the GridClient's pool
+    instead of a pool of its own.
+    """
+
+    def __init__(self, client):
+        self._grid = client
+        super().__init__(client_config=ClientConfig(client.remote_url, keep_alive=True, timeout=command_timeout))
+
+    def _get_connection_manager(self):
+        return self._grid.manager
+
+    def execute(self, command, params):
+        start = time.perf_counter()
+        try:
+            return super().execute(command, params)
+        finally:
+            self._grid.record(command, time.perf_counter() - start)
+
+    def close(self):
+        pass  # The pool is shared with the other browsers, GridClient.close() closes it
@@ -0,0 +1,73 @@
+import json
+
+# URL patterns (Chrome DevTools wildcard syntax) blocked by each named profile
+_media = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.ts", "*.mp3", "*.ogg",
+    "*scene7.com/is/image*",
+]
+_third_party = [
+    "*doubleclick.net*", "*googlesyndication.com*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*googleadservices.com*", "*facebook.net*", "*facebook.com/tr*", "*connect.facebook.*",
+    "*criteo.com*", "*criteo.net*", "*adobedtm.com*", "*omtrdc.net*", "*demdex.net*", "*everesttech.net*",
+    "*bat.bing.com*", "*pinimg.com/ct*", "*ct.pinterest.com*", "*analytics.tiktok.com*",
+    "*snapchat.com*", "*hotjar.com*", "*quantummetric.com*", "*nr-data.net*", "*newrelic.com*",
+    "*branch.io*", "*adsrvr.org*", "*amazon-adsystem.com*", "*taboola.com*", "*outbrain.com*",
+]
+profiles = {
+    "text-only": _media + _third_party,
+    "no-third-party": _third_party,
+    "no-media": _media,
+}
+
+
+def patterns_for(profile, extra_patterns=()):
+    """
+    Returns the URL patterns blocked by a profile.
+    :param profile: Name of a profile in `profiles`, or None for no profile.
+    :param extra_patterns: Additional patterns to block.
+    :return: List of URL patterns
+    """
+    if profile is not None and profile not in profiles:
+        raise ValueError("Unknown request blocking profile %r, expected one of %s" % (profile, ", ".join(profiles)))
+    return list(profiles.get(profile, [])) + list(extra_patterns)
+
+
+def chrome_logging_prefs():
+    """
+    Returns the capability enabling the performance log used to count requests.
+    :return: Tuple (capability name, value)
+    """
+    return "goog:loggingPrefs", {"performance": "ALL"}
+
+
+def apply(driver, patterns):
+    """
+    Blocks requests matching the patterns for the lifetime of the browser session.
+    Only Chromium browsers expose the DevTools command used here.
+    :param driver: WebDriver instance.
+    :param patterns: List of URL patterns.
+    :return: True when blocking was applied, False when the browser does not support it
+    """
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return False
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    return True
+
+
+def count_requests(driver):
+    """
+    Counts the requests the browser started since the last call, reading (and so draining) the performance log.
+    :param driver: WebDriver instance launched with chrome_logging_prefs().
+    :return: Tuple (allowed, blocked)
+    """
+    started = blocked = 0
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message["method"] == "Network.requestWillBeSent":
+            started += 1
+        elif message["method"] == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            blocked += 1
+    return started - blocked, blocked
@@ -0,0 +1,191 @@
+import time
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+# Key of the flake database in the pytest cache
+flakes_key = "reruns/flakes"
+# Consecutive clean passes after which a quarantined test rejoins the main lane
+release_after = 5
+# More failures than this point at a broken build or site rather than flaky timing, so nothing is rerun
+max_rerun_items = 20
+
+
+class FlakeDatabase:
+    """
+    Outcome history of tests that needed a rerun, kept in the pytest cache across runs.
+    A test passing on retry is flaky and quarantined until it passes `release_after` runs in a row without one.
+    """
+
+    def __init__(self, tests=None):
+        """
+        Initializes the database.
+        :param tests: Dict of test node ID to {"flaky", "failed", "streak", "quarantined", "last_flaky"}.
+        """
+        self.tests = tests or {}
+
+    @classmethod
+    def load(cls, config):
+        """
+        Reads the database from the pytest cache.
+        :return: FlakeDatabase, empty when the cache is disabled or holds nothing yet
+        """
+        cache = getattr(config, "cache", None)
+        return cls(cache.get(flakes_key, {}) if cache else {})
+
+    def save(self, config):
+        """
+        Writes the database to the pytest cache.
+        """
+        cache = getattr(config, "cache", None)
+        if cache:
+            cache.set(flakes_key, self.tests)
+
+    def record(self, nodeid, outcome):
+        """
+        Adds the final outcome of a test in this run.
+        :param nodeid: Test node ID.
+        :param outcome: 'passed', 'flaky' (passed on retry) or 'failed' (failed every attempt).
+        """
+        entry = self.tests.get(nodeid)
+        if entry is None:
+            if outcome == "passed":
+                return  # Tests that never needed a rerun are not tracked
+            entry = self.tests[nodeid] = {"flaky": 0, "failed": 0, "streak": 0, "quarantined": False, "last_flaky": None}
+        if outcome == "flaky":
+            entry.update(flaky=entry["flaky"] + 1, streak=0, quarantined=True, last_flaky=round(time.time()))
+        elif outcome == "failed":
+            entry.update(failed=entry["failed"] + 1, streak=0)
+        else:
+            entry["streak"] += 1
+            if entry["streak"] >= release_after:
+                entry["quarantined"] = False
+
+    def is_quarantined(self, nodeid):
+        return self.tests.get(nodeid, {}).get("quarantined", False)
+
+
+def apply_quarantine(config, items, database, lane):
+    """
+    Marks quarantined tests with the 'quarantine' marker and selects the lane to run.
+    :param items: Collected pytest items, filtered in place.
+    :param database: FlakeDatabase.
+    :param lane: 'include' to run every test, 'exclude' to leave quarantined tests out, 'only' to run just them.
+    """
+    selected, deselected = [], []
+    for item in items:
+        quarantined = database.is_quarantined(item.nodeid)
+        if quarantined:
+            item.add_marker(pytest.mark.quarantine)
+        if lane == "include" or (lane == "only") == quarantined:
+            selected.append(item)
+        else:
+            deselected.append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+class RerunPlugin:
+    """
+    pytest plugin rerunning the failed tests once the whole run is done, on the process that ran them.
+    The browser pool stays up until the end of the session, so reruns get warm browsers.
+    Every rerun report carries a ('rerun', attempt) user property.
+    """
+
+    def __init__(self, reruns):
+        """
+        :param reruns: Attempts per failed test.
+        """
+        self.reruns = reruns
+        self.failed = set()
+
+    def pytest_runtest_logreport(self, report):
+        if report.failed and not hasattr(report, "wasxfail") and "rerun" not in dict(report.user_properties):
+            self.failed.add(report.nodeid)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtestloop(self, session):
+        yield
+        items = [item for item in session.items if item.nodeid in self.failed]
+        if not items or len(items) > max_rerun_items or session.shouldfail or session.shouldstop:
+            return
+        interactor = _xdist_interactor(session)
+        for index, item in enumerate(items):
+            nextitem = items[index + 1] if index + 1 < len(items) else None
+            if interactor is not None:
+                interactor.item_index = session.items.index(item)
+            for attempt in range(1, self.reruns + 1):
+                item._initrequest()  # Fresh fixture values for the new attempt
+                item.user_properties[:] = [prop for prop in item.user_properties if prop[0] != "rerun"]
+                item.user_properties.append(("rerun", attempt))
+                reports = runtestprotocol(item, nextitem=nextitem, log=True)
+                if not any(report.failed for report in reports):
+                    break
+
+
+def _xdist_interactor(session):
+    """
+    Returns the pytest-xdist plugin of a worker process, which tags every report with the index of
+    the item it believes is running and needs that index pointed at the rerun item.
+    :return: WorkerInteractor, or None outside of an xdist worker
+    """
+    for plugin in session.config.pluginmanager.get_plugins():
+        if type(plugin).__name__ == "WorkerInteractor":
+            return plugin
+    return None
+
+
+class FlakeRecorderPlugin:
+    """
+    pytest plugin turning rerun reports into final outcomes and recording them in the flake database.
+    Registered on the process that receives all reports: the xdist controller, or the only process.
+    The failed attempts of a rerun test are moved from the 'failed'/'error' stats to 'rerun',
+    so the run's result and exit status follow the last attempt.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.outcomes = {}
+        self.session = None
+
+    def pytest_sessionstart(self, session):
+        self.session = session
+
+    def pytest_runtest_logreport(self, report):
+        if hasattr(report, "wasxfail"):
+            return
+        rerun = "rerun" in dict(report.user_properties)
+        if rerun and report.when == "setup":
+            self._retire_failures(report.nodeid)
+        if report.failed:
+            self.outcomes[report.nodeid] = "failed"
+        elif report.when == "call" and report.passed:
+            self.outcomes[report.nodeid] = "flaky" if rerun else "passed"
+
+    def _retire_failures(self, nodeid):
+        reporter = self.session.config.pluginmanager.get_plugin("terminalreporter")
+        if reporter is None:
+            return
+        stats = reporter.stats
+        for key in ("failed", "error"):
+            retired = [report for report in stats.get(key, []) if report.nodeid == nodeid]
+            if not retired:
+                continue
+            stats[key] = [report for report in stats[key] if report.nodeid != nodeid]
+            if not stats[key]:
+                del stats[key]
+            stats.setdefault("rerun", []).extend(retired)
+            self.session.testsfailed -= len(retired)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        flaky = sorted(nodeid for nodeid, outcome in self.outcomes.items() if outcome == "flaky")
+        if flaky:
+            terminalreporter.section("flaky tests (passed on rerun, quarantined)")
+            for nodeid in flaky:
+                terminalreporter.write_line(nodeid)
+
+    def pytest_sessionfinish(self, session):
+        for nodeid, outcome in self.outcomes.items():
+            self.database.record(nodeid, outcome)
+        self.database.save(session.config)
@@ -0,0 +1,184 @@
+import os
+import weakref
+
+from selenium.common.exceptions import WebDriverException
+
+try:
+    import psutil
+except ImportError:  # psutil is optional, without it only the in-browser metrics are sampled
+    psutil = None
+
+# Growth over a single test above which the test is flagged as leaking
+leak_rss_mb = 50
+leak_heap_mb = 20
+leak_handles = 50
+# DevTools Performance metrics sampled, by the name they are reported under
+devtools_metrics = {"JSHeapUsedSize": "js_heap_mb", "Nodes": "dom_nodes", "JSEventListeners": "event_listeners"}
+# Executable names of the WebDriver servers reaped when their parent process is gone
+driver_names = {"chromedriver", "chromedriver.exe", "geckodriver", "geckodriver.exe", "msedgedriver",
+                "msedgedriver.exe", "IEDriverServer.exe"}
+
+
+class ResourceMonitor:
+    """
+    Samples the memory and handles of each browser's process tree (WebDriver server, browser, renderers)
+    and the page's JS heap around every test, and reaps the driver processes left running at the end.
+    Process figures need psutil and local browsers; the JS heap needs a Chromium browser.
+    """
+
+    def __init__(self, rss_threshold_mb=None):
+        """
+        Initializes the ResourceMonitor.
+        :param rss_threshold_mb: RSS growth in MB flagging a test as leaking, defaults to leak_rss_mb.
+        """
+        self.rss_threshold_mb = leak_rss_mb if rss_threshold_mb is None else rss_threshold_mb
+        self._drivers = weakref.WeakKeyDictionary()
+        # WebDriver server processes by PID; psutil.Process remembers the creation time, so a PID
+        # reused by another process after the server exited is never mistaken for it
+        self._processes = {}
+
+    def track(self, driver):
+        """
+        Registers a freshly launched browser, remembering its WebDriver server process for reaping.
+        :param driver: WebDriver instance.
+        """
+        process = getattr(getattr(driver, "service", None), "process", None)
+        pid = getattr(process, "pid", None)
+        self._drivers[driver] = pid
+        if psutil is not None and pid is not None:
+            try:
+                self._processes[pid] = psutil.Process(pid)
+            except psutil.NoSuchProcess:
+                pass
+
+    def sample(self, driver):
+        """
+        Measures a browser's resources.
+        :param driver: WebDriver instance registered with track().
+        :return: Dict of 'driver_rss_mb', 'browser_rss_mb', 'renderer_rss_mb', 'processes' and 'handles'
+                 (with psutil, for local browsers) and the DevTools metrics (Chromium)
+        """
+        sample = {}
+        pid = self._drivers.get(driver)
+        if psutil is not None and pid is not None:
+            sample.update(_process_tree_usage(pid))
+        if hasattr(driver, "execute_cdp_cmd"):
+            try:
+                driver.execute_cdp_cmd("Performance.enable", {})
+                metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+            except WebDriverException:
+                metrics = []
+            for metric in metrics:
+                name = devtools_metrics.get(metric["name"])
+                if name == "js_heap_mb":
+                    sample[name] = round(metric["value"] / 1048576, 2)
+                elif name is not None:
+                    sample[name] = int(metric["value"])
+        return sample
+
+    def compare(self, before, after):
+        """
+        Computes the growth between two samples and flags the test when it exceeds the thresholds.
+        :return: Tuple (dict of deltas, list of leak descriptions, empty when the test did not leak)
+        """
+        delta = {name: round(after[name] - before[name], 2) for name in after if name in before}
+        rss = sum(delta.get(name, 0) for name in ("driver_rss_mb", "browser_rss_mb", "renderer_rss_mb"))
+        leaks = []
+        if rss > self.rss_threshold_mb:
+            leaks.append("RSS grew by %.1f MB" % rss)
+        if delta.get("js_heap_mb", 0) > leak_heap_mb:
+            leaks.append("JS heap grew by %.1f MB" % delta["js_heap_mb"])
+        if delta.get("handles", 0) > leak_handles:
+            leaks.append("%d more open handles" % delta["handles"])
+        return delta, leaks
+
+    def reap(self):
+        """
+        Kills what is left of the browsers once the pool is shut down: the process trees of the
+        WebDriver servers launched in this process, and of driver servers of the same user whose
+        parent process is gone (left behind by crashed or killed runs).
+        :return: List of reaped process descriptions
+        """
+        if psutil is None:
+            return []
+        roots = []
+        for process in self._processes.values():
+            try:
+                if process.is_running() and process.name() in driver_names:
+                    roots.append(process)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        user = _username()
+        for process in psutil.process_iter(["name", "ppid", "username"]):
+            info = process.info
+            if (info["name"] in driver_names and info["username"] == user and process.pid not in self._processes
+                    and info["ppid"] != os.getpid()
+                    and (info["ppid"] in (0, 1) or not psutil.pid_exists(info["ppid"]))):
+                roots.append(process)
+        reaped = []
+        for root in roots:
+            try:
+                tree = root.children(recursive=True) + [root]
+            except psutil.NoSuchProcess:
+                continue
+            for process in tree:
+                try:
+                    name = process.name()
+                    process.kill()
+                    reaped.append("%s (%d)" % (name, process.pid))
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            psutil.wait_procs(tree, timeout=5)
+        self._processes.clear()
+        return reaped
+
+
+def delta_html(delta, leaks):
+    """
+    Renders a test's resource growth as an HTML fragment for the report.
+    :param delta: Dict from ResourceMonitor.compare().
+    :param leaks: Leak descriptions from ResourceMonitor.compare().
+    :return: HTML string
+    """
+    cells = ", ".join("%s %+g" % (name, value) for name, value in sorted(delta.items()))
+    warning = '<p style="color: #cf222e">Possible leak: %s</p>' % "; ".join(leaks) if leaks else ""
+    return "<div><p>Resources: %s</p>%s</div>" % (cells or "not measured", warning)
+
+
+def _process_tree_usage(pid):
+    """
+    Adds up the resident memory and open handles of a WebDriver server and the browser processes below it.
+    """
+    usage = {"driver_rss_mb": 0.0, "browser_rss_mb": 0.0, "renderer_rss_mb": 0.0, "processes": 0, "handles": 0}
+    try:
+        root = psutil.Process(pid)
+        tree = [root] + root.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return {}
+    for process in tree:
+        try:
+            with process.oneshot():
+                rss = process.memory_info().rss / 1048576
+                handles = process.num_handles() if os.name == "nt" else process.num_fds()
+                command = " ".join(process.cmdline())
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        if process.pid == pid:
+            kind = "driver_rss_mb"
+        elif "--type=renderer" in command or "-contentproc" in command:
+            kind = "renderer_rss_mb"
+        else:
+            kind = "browser_rss_mb"
+        usage[kind] += rss
+        usage["processes"] += 1
+        usage["handles"] += handles
+    for kind in ("driver_rss_mb", "browser_rss_mb", "renderer_rss_mb"):
+        usage[kind] = round(usage[kind], 2)
+    return usage
+
+
+def _username():
+    try:
+        return psutil.Process().username()
+    except psutil.Error:
+        return None
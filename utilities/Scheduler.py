@@ -0,0 +1,145 @@
+import statistics
+
+# Key of the recorded durations in the pytest cache
+history_key = "scheduler/history"
+# Weight of the latest run when updating a recorded duration
+smoothing = 0.5
+
+
+def group_of(nodeid):
+    """
+    Returns the scheduling group of a test: its class, or its module for plain functions.
+    Tests of one group share class-scoped fixtures such as the browser, so they always run together.
+    """
+    return nodeid.rsplit("::", 1)[0]
+
+
+class DurationHistory:
+    """
+    Per-test durations (setup + call + teardown) and smoke markers recorded over previous runs.
+    """
+
+    def __init__(self, tests=None):
+        """
+        Initializes the history.
+        :param tests: Dict of test node ID to {"duration": seconds, "smoke": bool}.
+        """
+        self.tests = tests or {}
+        self._current = {}
+
+    @classmethod
+    def load(cls, config):
+        """
+        Reads the history from the pytest cache.
+        :return: DurationHistory, empty when the cache is disabled or holds nothing yet
+        """
+        cache = getattr(config, "cache", None)
+        return cls(cache.get(history_key, {}) if cache else {})
+
+    def record(self, report):
+        """
+        Adds the duration of one test phase of the current run.
+        :param report: TestReport from pytest_runtest_logreport.
+        """
+        current = self._current.setdefault(report.nodeid, {"duration": 0.0, "smoke": "smoke" in report.keywords})
+        current["duration"] += report.duration
+
+    def save(self, config):
+        """
+        Merges the current run into the history and writes it to the pytest cache.
+        """
+        for nodeid, current in self._current.items():
+            previous = self.tests.get(nodeid)
+            if previous is not None:
+                current["duration"] = smoothing * current["duration"] + (1 - smoothing) * previous["duration"]
+            self.tests[nodeid] = {"duration": round(current["duration"], 3), "smoke": current["smoke"]}
+        cache = getattr(config, "cache", None)
+        if cache:
+            cache.set(history_key, self.tests)
+
+    def group_cost(self, nodeids):
+        """
+        Estimates how long a group of tests takes; unknown tests count as an average test.
+        :return: Seconds
+        """
+        known = [self.tests[nodeid]["duration"] for nodeid in nodeids if nodeid in self.tests]
+        default = statistics.mean(test["duration"] for test in self.tests.values()) if self.tests else 1.0
+        return sum(known) + default * (len(nodeids) - len(known))
+
+    def is_smoke(self, nodeid):
+        return self.tests.get(nodeid, {}).get("smoke", False)
+
+    def order_groups(self, groups):
+        """
+        Orders groups for distribution: groups holding smoke tests first, then the longest first.
+        :param groups: Dict of group name to list of node IDs.
+        :return: List of group names
+        """
+        return sorted(groups, key=lambda group: (
+            not any(self.is_smoke(nodeid) for nodeid in groups[group]),
+            -self.group_cost(groups[group]),
+        ))
+
+
+def reorder_items(items):
+    """
+    Moves the groups holding smoke tests to the front, keeping every group together and in order.
+    :param items: Collected pytest items, reordered in place.
+    """
+    groups = {}
+    for item in items:
+        groups.setdefault(group_of(item.nodeid), []).append(item)
+    ordered = sorted(groups.values(), key=lambda group: not any(item.get_closest_marker("smoke") for item in group))
+    items[:] = [item for group in ordered for item in group]
+
+
+class DurationRecorderPlugin:
+    """
+    pytest plugin recording test durations into the history at the end of the run.
+    Registered on the process that receives all reports: the xdist controller, or the only process.
+    """
+
+    def __init__(self, history):
+        self.history = history
+
+    def pytest_runtest_logreport(self, report):
+        self.history.record(report)
+
+    def pytest_sessionfinish(self, session):
+        self.history.save(session.config)
+
+
+class HistorySchedulerPlugin:
+    """
+    pytest-xdist plugin distributing test groups longest-first based on the recorded history.
+    Only registered when pytest-xdist is installed.
+    """
+
+    def __init__(self, history):
+        self.history = history
+
+    def pytest_xdist_make_scheduler(self, config, log):
+        if config.getoption("dist") != "loadscope":
+            return None
+        from xdist.scheduler import LoadScopeScheduling
+
+        history = self.history
+
+        class HistoryScheduling(LoadScopeScheduling):
+            """
+            Load-scope scheduling that hands out smoke groups first and then the longest groups,
+            so no worker is left running the slow classes at the end of the run.
+            """
+
+            _ordered = False
+
+            def _assign_work_unit(self, node):
+                if not self._ordered:
+                    self._ordered = True
+                    groups = dict(self.workqueue)
+                    self.workqueue.clear()
+                    for group in history.order_groups({name: list(nodeids) for name, nodeids in groups.items()}):
+                        self.workqueue[group] = groups[group]
+                super()._assign_work_unit(node)
+
+        return HistoryScheduling(config, log)
@@ -0,0 +1,90 @@
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from utilities import Workers
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, without it screenshots are stored as captured
+    Image = None
+
+# Bounding box of the thumbnails embedded in the HTML report
+thumbnail_size = (304, 228)
+thumbnail_quality = 70
+
+_executor = None
+_futures = []
+_seen = set()
+_lock = threading.Lock()
+
+
+def screenshot_dir():
+    """
+    Returns the directory holding screenshots, shared by all workers since files are named by content.
+    :return: Path of the directory
+    """
+    path = os.path.join(Workers.artifacts_root, "screenshots")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def save(png):
+    """
+    Schedules a screenshot to be compressed and written off the calling thread.
+    Identical screenshots are only written once.
+    :param png: PNG bytes returned by driver.get_screenshot_as_png().
+    :return: Tuple (full image path, thumbnail path); the files appear once the background write is done
+    """
+    global _executor
+    digest = hashlib.sha256(png).hexdigest()[:20]
+    directory = screenshot_dir()
+    full_path = os.path.join(directory, digest + ".png")
+    thumb_path = os.path.join(directory, digest + "_thumb.jpg") if Image else full_path
+    with _lock:
+        if digest not in _seen:
+            _seen.add(digest)
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="screenshots")
+            _futures.append(_executor.submit(_write, png, full_path, thumb_path))
+    return full_path, thumb_path
+
+
+def flush():
+    """
+    Blocks until every scheduled screenshot has been written, then stops the writer threads.
+    """
+    global _executor
+    with _lock:
+        futures, executor = list(_futures), _executor
+        _futures.clear()
+        _executor = None
+    wait(futures)
+    if executor is not None:
+        executor.shutdown()
+
+
+def _write(png, full_path, thumb_path):
+    if os.path.exists(full_path) and os.path.exists(thumb_path):
+        return
+    if Image is None:
+        _write_atomic(full_path, png)
+        return
+    image = Image.open(io.BytesIO(png))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True)
+    _write_atomic(full_path, buffer.getvalue())
+    image.thumbnail(thumbnail_size)
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, "JPEG", quality=thumbnail_quality, optimize=True)
+    _write_atomic(thumb_path, buffer.getvalue())
+
+
+def _write_atomic(path, data):
+    # Several workers may write the same screenshot, so never expose a half-written file
+    temp_path = "%s.%d.tmp" % (path, os.getpid())
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
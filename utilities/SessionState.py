@@ -0,0 +1,148 @@
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+# Lifetime of a stored session when none of the login cookies carries an expiry
+default_max_age = 12 * 60 * 60
+
+# Copies web storage of the current origin
+capture_storage_script = """
+    function dump(storage) {
+        var items = {};
+        for (var i = 0; i < storage.length; i++) { items[storage.key(i)] = storage.getItem(storage.key(i)); }
+        return items;
+    }
+    return [location.origin, dump(window.localStorage), dump(window.sessionStorage)];
+"""
+
+# Fills web storage, either right away or (as a DevTools new-document script) before the page scripts run
+restore_storage_script = """
+(function (origin, local, session) {
+    if (location.origin !== origin) { return; }
+    Object.keys(local).forEach(function (key) { window.localStorage.setItem(key, local[key]); });
+    Object.keys(session).forEach(function (key) { window.sessionStorage.setItem(key, session[key]); });
+})(%s, %s, %s);
+"""
+
+
+class SessionState:
+    """
+    Snapshot of a signed-in browser session (cookies plus local and session storage) kept on disk,
+    so tests needing a signed-in user can skip the UI login.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the SessionState store.
+        :param path: JSON file the snapshot is kept in.
+        """
+        self.path = path
+
+    @staticmethod
+    def capture(driver, login_cookies=None):
+        """
+        Takes a snapshot of the current session.
+        :param driver: WebDriver instance on a page of the signed-in site.
+        :param login_cookies: Names of the cookies set by the login; their lifetime decides when the
+                              snapshot expires. Defaults to all cookies.
+        :return: Snapshot dict
+        """
+        origin, local, session = driver.execute_script(capture_storage_script)
+        cookies = driver.get_cookies()
+        lifetimes = [cookie["expiry"] for cookie in cookies
+                     if "expiry" in cookie and (login_cookies is None or cookie["name"] in login_cookies)]
+        expires = min(lifetimes) if lifetimes else time.time() + default_max_age
+        return {
+            "origin": origin,
+            "cookies": cookies,
+            "local_storage": local,
+            "session_storage": session,
+            "expires": min(expires, time.time() + default_max_age),
+        }
+
+    def save(self, state):
+        """
+        Writes a snapshot to disk.
+        :param state: Snapshot from capture().
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = "%s.%d.tmp" % (self.path, os.getpid())
+        with open(temp_path, "w") as file:
+            json.dump(state, file)
+        os.replace(temp_path, self.path)
+
+    def load(self, origin):
+        """
+        Reads the stored snapshot.
+        :param origin: Origin of the site under test, e.g. 'https://www.target.com'.
+        :return: Snapshot dict, or None when there is none, it expired or belongs to another site
+        """
+        try:
+            with open(self.path) as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if state.get("origin") != origin or state.get("expires", 0) <= time.time():
+            return None
+        return state
+
+    def clear(self):
+        """
+        Deletes the stored snapshot, e.g. when it no longer signs the user in.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def restore(driver, state, url):
+        """
+        Opens a URL with the snapshot's cookies and storage in place.
+        Chromium browsers get everything injected ahead of a single page load; other browsers need
+        the page loaded once to set cookies on its domain and a second time to pick them up.
+        :param driver: WebDriver instance.
+        :param state: Snapshot from capture() or load().
+        :param url: URL to open.
+        """
+        storage_script = restore_storage_script % (
+            json.dumps(state["origin"]), json.dumps(state["local_storage"]), json.dumps(state["session_storage"]))
+        if hasattr(driver, "execute_cdp_cmd"):
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": [_cdp_cookie(cookie) for cookie in state["cookies"]]})
+            script = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": storage_script})
+            try:
+                driver.get(url)
+            finally:
+                driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script["identifier"]})
+            return
+        driver.get(url)
+        for cookie in state["cookies"]:
+            driver.add_cookie(cookie)
+        driver.execute_script(storage_script)
+        driver.refresh()
+
+
+def origin_of(url):
+    """
+    Returns the origin (scheme, host and port) of a URL.
+    """
+    parts = urlsplit(url)
+    return "%s://%s" % (parts.scheme, parts.netloc)
+
+
+def _cdp_cookie(cookie):
+    converted = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain"),
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if "expiry" in cookie:
+        converted["expires"] = cookie["expiry"]
+    if cookie.get("sameSite"):
+        converted["sameSite"] = cookie["sameSite"]
+    return converted
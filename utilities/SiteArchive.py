@@ -0,0 +1,284 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Prefix of local paths standing for another host, e.g. /__host__/api.target.com/v1/...
+host_prefix = "/__host__/"
+
+# Headers that are either recomputed by the server or would break a locally served copy
+_dropped_headers = {
+    "connection", "keep-alive", "transfer-encoding", "content-length", "content-encoding",
+    "content-security-policy", "content-security-policy-report-only", "strict-transport-security",
+    "alt-svc", "upgrade",
+}
+_text_types = ("text/", "javascript", "json", "xml")
+# Absolute URLs in text bodies, with or without JSON-escaped slashes and a port
+_absolute_url = re.compile(rb"https?:(\\?/)(\\?/)([A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+(?::\d+)?)")
+# Hosts of XML namespace URIs, e.g. http://www.w3.org/2000/svg; these name vocabularies and are never
+# fetched, and createElementNS() and xmlns= only work with them as published
+namespace_hosts = {b"www.w3.org", b"purl.org", b"ns.adobe.com", b"schemas.xmlsoap.org", b"schemas.microsoft.com"}
+_cookie_domain = re.compile(r";\s*domain=[^;]*", re.IGNORECASE)
+# Flags a cookie served over plain http on localhost would be rejected for
+_cookie_flags = re.compile(r";\s*(secure|samesite=none)(?=;|$)", re.IGNORECASE)
+
+
+class SiteArchive:
+    """
+    On-disk archive of HTTP responses, keyed by method, path and request body.
+    Layout: index.json maps request keys to status and headers, bodies/ holds the response bodies.
+    """
+
+    def __init__(self, path):
+        """
+        Opens (or creates) an archive directory.
+        :param path: Directory of the archive.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        index_path = os.path.join(path, "index.json")
+        if os.path.exists(index_path):
+            with open(index_path) as file:
+                self.entries = json.load(file)
+        else:
+            self.entries = {}
+        # Fallback lookup ignoring the query string, which often holds timestamps or visitor ids
+        self._by_path = {}
+        for key in self.entries:
+            self._by_path[SiteArchive._strip_query(key)] = key
+
+    @staticmethod
+    def key(method, path, body=b""):
+        """
+        Builds the archive key of a request.
+        :return: Key string
+        """
+        key = "%s %s" % (method, path)
+        if body:
+            key += " #" + hashlib.sha256(body).hexdigest()[:16]
+        return key
+
+    @staticmethod
+    def _strip_query(key):
+        method, _, rest = key.partition(" ")
+        return "%s %s" % (method, rest.split("?", 1)[0].split(" #", 1)[0])
+
+    def lookup(self, key):
+        """
+        Returns the archived response of a request.
+        :param key: Key from SiteArchive.key().
+        :return: Tuple (status, headers, body) or None when the request was never recorded
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            fallback = self._by_path.get(SiteArchive._strip_query(key))
+            entry = self.entries.get(fallback) if fallback else None
+        if entry is None:
+            return None
+        with open(os.path.join(self.path, "bodies", entry["body"]), "rb") as file:
+            return entry["status"], entry["headers"], file.read()
+
+    def store(self, key, status, headers, body):
+        """
+        Adds a response to the archive.
+        :param key: Key from SiteArchive.key().
+        :param status: HTTP status code.
+        :param headers: List of (name, value) header pairs.
+        :param body: Response body bytes.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        body_dir = os.path.join(self.path, "bodies")
+        os.makedirs(body_dir, exist_ok=True)
+        body_path = os.path.join(body_dir, digest)
+        if not os.path.exists(body_path):
+            with open(body_path, "wb") as file:
+                file.write(body)
+        with self._lock:
+            self.entries[key] = {"status": status, "headers": headers, "body": digest}
+            self._by_path[SiteArchive._strip_query(key)] = key
+
+    def save(self):
+        """
+        Writes the index of the archive to disk.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            with open(os.path.join(self.path, "index.json"), "w") as file:
+                json.dump(self.entries, file, indent=1, sort_keys=True)
+
+
+class ArchiveServer:
+    """
+    Local HTTP server standing in for the site under test.
+    In record mode it forwards requests to the real site and archives the responses,
+    in replay mode it serves responses from the archive only.
+    Absolute URLs in text responses are rewritten to go through the server when they are served,
+    so pages, scripts and XHR calls to any host end up in (or come from) the archive.
+    """
+
+    def __init__(self, archive, site_url, record=False, timeout=30):
+        """
+        Initializes the server.
+        :param archive: SiteArchive to record into or replay from.
+        :param site_url: URL of the real site, e.g. 'https://www.target.com/'.
+        :param record: True to forward requests to the site and record them.
+        :param timeout: Seconds to wait for the real site in record mode.
+        """
+        self.archive = archive
+        self.site = urlsplit(site_url)
+        self.record = record
+        self.timeout = timeout
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        Returns the local URL of the site's start page.
+        :return: URL string
+        """
+        host, port = self._httpd.server_address[:2]
+        return "http://%s:%d%s" % (host, port, self.site.path or "/")
+
+    def start(self):
+        """
+        Starts serving on a free local port in a background thread.
+        """
+        server = self
+
+        class _Handler(_ArchiveHandler):
+            archive_server = server
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="site-archive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the server and, in record mode, saves the archive.
+        """
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self.record:
+            self.archive.save()
+
+    def upstream_url(self, path):
+        """
+        Maps a local request path to the URL of the real site.
+        :param path: Request path, including the query string.
+        :return: Absolute upstream URL
+        """
+        if path.startswith(host_prefix):
+            host, _, rest = path[len(host_prefix):].partition("/")
+            return "https://%s/%s" % (host, rest)
+        return "%s://%s%s" % (self.site.scheme, self.site.netloc, path)
+
+    def rewrite(self, body, local_netloc):
+        """
+        Points absolute URLs in a text body at the local server, except XML namespace URIs.
+        """
+        local = local_netloc.encode()
+        prefix = host_prefix.strip("/").encode()
+        site_host = self.site.netloc.encode()
+
+        def _replace(match):
+            slash, second, host = match.group(1), match.group(2), match.group(3)
+            if host == site_host:
+                return b"http:" + slash + second + local
+            if host in namespace_hosts:
+                return match.group(0)
+            return b"http:" + slash + second + local + slash + prefix + slash + host
+        return _absolute_url.sub(_replace, body)
+
+    def fetch(self, method, path, headers, body):
+        """
+        Forwards a request to the real site.
+        :return: Tuple (status, headers, body)
+        """
+        request = urllib.request.Request(self.upstream_url(path), data=body or None, method=method)
+        for name, value in headers:
+            if name.lower() not in ("host", "accept-encoding", "connection", "content-length", "origin", "referer"):
+                request.add_header(name, value)
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as error:
+            response = error
+        with response:
+            return response.status, list(response.headers.items()), response.read()
+
+
+class _ArchiveHandler(BaseHTTPRequestHandler):
+    archive_server = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_HEAD(self):
+        self._handle()
+
+    def do_OPTIONS(self):
+        self._handle()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        server = self.archive_server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        key = SiteArchive.key(self.command, self.path, body)
+        if server.record:
+            try:
+                status, headers, content = server.fetch(self.command, self.path, self.headers.items(), body)
+            except OSError:
+                status, headers, content = 502, [], b""
+            headers = _clean_headers(headers)
+            server.archive.store(key, status, headers, content)
+        else:
+            response = server.archive.lookup(key)
+            if response is None:
+                status, headers, content = 404, [], b""
+            else:
+                status, headers, content = response
+        # Bodies are archived as served upstream and pointed at this server when served, since
+        # every run binds a new port
+        if _is_text(headers):
+            content = server.rewrite(content, self.headers.get("Host", ""))
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(content)
+
+
+def _clean_headers(headers):
+    cleaned = []
+    for name, value in headers:
+        if name.lower() in _dropped_headers:
+            continue
+        if name.lower() == "set-cookie":
+            value = _cookie_domain.sub("", value)
+            value = _cookie_flags.sub("", value)
+        cleaned.append((name, value))
+    return cleaned
+
+
+def _is_text(headers):
+    for name, value in headers:
+        if name.lower() == "content-type":
+            return any(kind in value.lower() for kind in _text_types)
+    return False
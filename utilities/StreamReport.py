@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+# Rows per page script; the index loads one script per page
+page_size = 500
+# Rows between two rewrites of the manifest, so an open index follows a running session
+manifest_every = 50
+
+# Static viewer. Data comes from scripts added with <script src>, which unlike fetch() also works
+# when the report is opened from disk: manifest.js, pages/NNNN.js and one details/ID.js per test
+index_html = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Test report</title>
+<style>
+    body { font-family: sans-serif; margin: 1em; }
+    table { border-collapse: collapse; width: 100%; }
+    td, th { border-bottom: 1px solid #ddd; padding: 2px 6px; text-align: left; font-size: 13px; }
+    tr.row { cursor: pointer; }
+    tr.row:hover { background: #f4f4f4; }
+    .passed { color: #1a7f37; } .failed, .error { color: #cf222e; } .skipped, .xfailed, .xpassed, .rerun { color: #9a6700; }
+    pre { background: #f6f8fa; padding: 6px; overflow: auto; max-height: 400px; }
+    #detail { border-top: 2px solid #888; margin-top: 1em; }
+</style>
+</head>
+<body>
+<h1>Test report</h1>
+<p id="summary">Loading...</p>
+<p>
+    <span id="outcomes"></span>
+    <input id="search" type="search" placeholder="Filter by test name" size="40">
+</p>
+<p><button id="prev">&lt;</button> <span id="position"></span> <button id="next">&gt;</button></p>
+<table><thead><tr><th>Test</th><th>Outcome</th><th>Duration</th><th>Worker</th></tr></thead><tbody id="rows"></tbody></table>
+<div id="detail"></div>
+<script>
+(function () {
+    var perView = 100, view = 0, manifest = null, rows = [], pageRows = [], loaded = 0, hidden = {}, query = "";
+    var details = {}, pollMs = 5000;
+    function element(tag, text, className) {
+        var node = document.createElement(tag);
+        if (text !== undefined) { node.textContent = text; }
+        if (className) { node.className = className; }
+        return node;
+    }
+    function load(src, done) {
+        var script = document.createElement("script");
+        script.src = src + "?" + Date.now();
+        script.onload = script.onerror = function () { script.remove(); if (done) { done(); } };
+        document.head.appendChild(script);
+    }
+    window.__reportManifest = function (data) { manifest = data; };
+    window.__reportRows = function (page, data) { Array.prototype.push.apply(pageRows[page - 1], data); };
+    window.__reportDetail = function (id, data) { details[id] = data; };
+
+    function matching() {
+        return rows.filter(function (row) {
+            return !hidden[row.outcome] && (!query || row.nodeid.toLowerCase().indexOf(query) !== -1);
+        });
+    }
+    function render() {
+        var selected = matching(), body = document.getElementById("rows");
+        var pages = Math.max(1, Math.ceil(selected.length / perView));
+        view = Math.min(view, pages - 1);
+        body.textContent = "";
+        selected.slice(view * perView, (view + 1) * perView).forEach(function (row) {
+            var tr = element("tr", undefined, "row");
+            tr.appendChild(element("td", row.nodeid + (row.attempt ? " (rerun " + row.attempt + ")" : "")));
+            tr.appendChild(element("td", row.outcome, row.outcome));
+            tr.appendChild(element("td", row.duration.toFixed(2) + "s"));
+            tr.appendChild(element("td", row.worker));
+            tr.onclick = function () { showDetail(row); };
+            body.appendChild(tr);
+        });
+        document.getElementById("position").textContent =
+            "page " + (view + 1) + " of " + pages + " (" + selected.length + " of " + rows.length + " tests)";
+        if (manifest) {
+            var totals = Object.keys(manifest.totals).map(function (key) { return manifest.totals[key] + " " + key; });
+            document.getElementById("summary").textContent =
+                totals.join(", ") + (manifest.finished ? "" : " (running)");
+            var outcomes = document.getElementById("outcomes");
+            Object.keys(manifest.totals).forEach(function (key) {
+                if (outcomes.querySelector("label." + key)) { return; }  // Outcomes get a filter as they show up
+                var box = element("input");
+                box.type = "checkbox";
+                box.checked = !hidden[key];
+                box.onchange = function () { hidden[key] = !box.checked; view = 0; render(); };
+                var label = element("label", undefined, key);
+                label.appendChild(box);
+                label.appendChild(document.createTextNode(key + " "));
+                outcomes.appendChild(label);
+            });
+        }
+    }
+    function showDetail(row) {
+        var panel = document.getElementById("detail");
+        panel.textContent = "Loading...";
+        load("details/" + row.id + ".js", function () {
+            var data = details[row.id];
+            panel.textContent = "";
+            panel.appendChild(element("h2", row.nodeid));
+            if (!data) { panel.appendChild(element("p", "No details recorded")); return; }
+            data.properties.forEach(function (property) {
+                if (property[0] === "screenshot" || property[0] === "thumbnail") { return; }
+                panel.appendChild(element("p", property[0] + ": " + JSON.stringify(property[1])));
+            });
+            if (data.screenshot) {
+                var link = element("a");
+                link.href = data.screenshot;
+                link.target = "_blank";
+                var image = element("img");
+                image.src = data.thumbnail || data.screenshot;
+                image.alt = "screenshot";
+                link.appendChild(image);
+                panel.appendChild(link);
+            }
+            data.phases.forEach(function (phase) {
+                panel.appendChild(element("h3", phase.when + ": " + phase.outcome + " in " + phase.duration.toFixed(2) + "s"));
+                if (phase.longrepr) { panel.appendChild(element("pre", phase.longrepr)); }
+                phase.sections.forEach(function (section) {
+                    panel.appendChild(element("h4", section[0]));
+                    panel.appendChild(element("pre", section[1]));
+                });
+            });
+        });
+    }
+    function loadPages() {
+        if (!manifest || loaded >= manifest.pages) {
+            render();
+            if (manifest && !manifest.finished) { setTimeout(poll, pollMs); }
+            return;
+        }
+        loaded += 1;
+        pageRows[loaded - 1] = [];
+        load("pages/" + ("000" + loaded).slice(-4) + ".js", function () {
+            rows = Array.prototype.concat.apply([], pageRows);
+            render();
+            loadPages();
+        });
+    }
+    function poll() {
+        // The last page read may have grown since, so it is read again with the new ones
+        loaded = Math.max(0, loaded - 1);
+        load("manifest.js", loadPages);
+    }
+    document.getElementById("prev").onclick = function () { view = Math.max(0, view - 1); render(); };
+    document.getElementById("next").onclick = function () { view += 1; render(); };
+    document.getElementById("search").oninput = function (event) {
+        query = event.target.value.toLowerCase();
+        view = 0;
+        render();
+    };
+    load("manifest.js", loadPages);
+})();
+</script>
+</body>
+</html>
+"""
+
+
+class StreamReportPlugin:
+    """
+    pytest plugin writing the HTML report to disk while the tests run.
+    Each finished test appends one summary row to a page script and writes its details
+    (tracebacks, captured output, properties, screenshot links) to a fragment loaded on demand,
+    so the session keeps nothing per test and the index only loads the short summary rows.
+    Registered on the process that receives all reports: the xdist controller, or the only process.
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: Directory the report is written to; its index.html is the entry point.
+        """
+        self.directory = directory
+        self.totals = {}
+        self.rows = 0
+        self._failed = {}
+        self._phases = {}
+        self._page = None
+        self._started = None
+
+    def pytest_sessionstart(self, session):
+        for name in ("pages", "details"):
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+            os.makedirs(os.path.join(self.directory, name))
+        with open(os.path.join(self.directory, "index.html"), "w", encoding="utf-8") as file:
+            file.write(index_html)
+        self._started = time.time()
+        self._write_manifest(finished=False)
+
+    def pytest_runtest_logreport(self, report):
+        phases = self._phases.setdefault(report.nodeid, [])
+        phases.append(report)
+        if report.when == "teardown":
+            del self._phases[report.nodeid]
+            self._add_test(report.nodeid, phases)
+
+    def pytest_sessionfinish(self, session):
+        if self._page is not None:
+            self._page.close()
+            self._page = None
+        self._write_manifest(finished=True)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.write_line("Streamed report: %s" % os.path.join(self.directory, "index.html"))
+
+    def _add_test(self, nodeid, phases):
+        merged = {}
+        for phase in phases:
+            merged.update(phase.user_properties)  # Later phases carry the most recent values
+        properties = list(merged.items())
+        attempt = dict(properties).get("rerun")
+        outcome = _outcome(phases)
+        detail_id = hashlib.sha1(("%s|%s" % (nodeid, attempt)).encode("utf-8")).hexdigest()[:16]
+        row = {
+            "id": detail_id,
+            "nodeid": nodeid,
+            "outcome": outcome,
+            "duration": round(sum(phase.duration for phase in phases), 3),
+            "worker": getattr(phases[-1], "worker_id", "main"),
+            "attempt": attempt,
+        }
+        detail = {
+            "phases": [{
+                "when": phase.when,
+                "outcome": phase.outcome,
+                "duration": round(phase.duration, 3),
+                "longrepr": phase.longreprtext if phase.longrepr else "",
+                "sections": [list(section) for section in phase.sections],
+            } for phase in phases],
+            "properties": [[name, value] for name, value in properties],
+        }
+        properties = dict(properties)
+        for name in ("screenshot", "thumbnail"):
+            if name in properties:
+                detail[name] = os.path.relpath(properties[name], self.directory).replace(os.sep, "/")
+        with open(os.path.join(self.directory, "details", detail_id + ".js"), "w", encoding="utf-8") as file:
+            file.write("__reportDetail(%s, %s);\n" % (json.dumps(detail_id), json.dumps(detail, default=str)))
+
+        if self.rows % page_size == 0:
+            if self._page is not None:
+                self._page.close()
+            page_path = os.path.join(self.directory, "pages", "%04d.js" % (self.rows // page_size + 1))
+            self._page = open(page_path, "a", encoding="utf-8")
+        self._page.write("__reportRows(%d, [%s]);\n" % (self.rows // page_size + 1, json.dumps(row)))
+        self._page.flush()
+        self.rows += 1
+        self.totals[outcome] = self.totals.get(outcome, 0) + 1
+        superseded = self._failed.pop(nodeid, None)
+        if superseded is not None:  # Counted as its last attempt, like the terminal summary does
+            self.totals[superseded] -= 1
+            if not self.totals[superseded]:
+                del self.totals[superseded]
+            self.totals["rerun"] = self.totals.get("rerun", 0) + 1
+        if outcome in ("failed", "error"):
+            self._failed[nodeid] = outcome  # Only failed tests are rerun
+        if self.rows % manifest_every == 0 or self.rows % page_size == 1:
+            self._write_manifest(finished=False)
+
+    def _write_manifest(self, finished):
+        manifest = {
+            "pages": (self.rows + page_size - 1) // page_size,
+            "tests": self.rows,
+            "totals": self.totals,
+            "started": self._started,
+            "finished": finished,
+        }
+        path = os.path.join(self.directory, "manifest.js")
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            file.write("__reportManifest(%s);\n" % json.dumps(manifest))
+        os.replace(path + ".tmp", path)
+
+
+def _outcome(phases):
+    """
+    Combines the setup, call and teardown reports of a test into one outcome.
+    """
+    for phase in phases:
+        if hasattr(phase, "wasxfail"):
+            return "xfailed" if phase.skipped else "xpassed"
+    for phase in phases:
+        if phase.failed:
+            return "failed" if phase.when == "call" else "error"
+    if any(phase.skipped for phase in phases):
+        return "skipped"
+    return "passed"
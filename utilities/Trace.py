@@ -0,0 +1,222 @@
+import base64
+import hashlib
+import html
+import io
+import logging
+import os
+import re
+import time
+from collections import deque
+
+from selenium.webdriver.remote.command import Command
+
+from utilities import Instrumentation, Workers
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, without it non-Chromium screenshots are embedded as captured
+    Image = None
+
+# Commands changing what the page shows; only their steps carry a screenshot and the URL
+action_commands = {
+    Command.GET, Command.CLICK_ELEMENT, Command.SEND_KEYS_TO_ELEMENT, Command.CLEAR_ELEMENT, Command.GO_BACK,
+    Command.GO_FORWARD, Command.REFRESH, Command.W3C_ACTIONS, Command.SWITCH_TO_WINDOW, Command.SWITCH_TO_FRAME,
+}
+# Scale and JPEG quality of the step screenshots
+screenshot_scale = 0.5
+screenshot_quality = 40
+# Log lines kept per step
+max_step_logs = 20
+
+# Key of the element ID in W3C responses and parameters
+_element_key = "element-6066-11e4-a52e-4f735466cecf"
+
+
+class TraceBuffer:
+    """
+    Rolling record of the last steps of a test on an instrumented driver: the WebDriver command,
+    its locator, the page URL, the log lines written since the previous step and, for actions,
+    a downscaled screenshot. Repeated commands, e.g. a wait polling for an element, fold into one step.
+    Steps are kept as captured and only encoded when dump() writes the timeline of a failed test.
+    """
+
+    def __init__(self, driver, recorder, size=20):
+        """
+        Initializes the TraceBuffer.
+        :param driver: WebDriver instance being traced.
+        :param recorder: Instrumentation.CommandRecorder of the driver.
+        :param size: Number of steps kept; older steps are dropped.
+        """
+        self.driver = driver
+        self.recorder = recorder
+        self.steps = deque(maxlen=size)
+        self._logs = deque(maxlen=max_step_logs)
+        self._locators = {}
+        self._url = None
+        self._viewport = None
+        self._started = None
+        self._tap = _LogTap(self._logs)
+
+    def start(self):
+        """
+        Starts tracing a test, dropping the steps of the previous one.
+        """
+        self.steps.clear()
+        self._logs.clear()
+        self._locators.clear()
+        self._started = time.perf_counter()
+        self.recorder.listeners.append(self._on_command)
+        logging.getLogger().addHandler(self._tap)
+
+    def stop(self):
+        """
+        Stops tracing; the recorded steps stay available to dump().
+        """
+        logging.getLogger().removeHandler(self._tap)
+        if self._on_command in self.recorder.listeners:
+            self.recorder.listeners.remove(self._on_command)
+
+    def _on_command(self, command, params, duration, response):
+        locator = self._locator(command, params, response)
+        last = self.steps[-1] if self.steps else None
+        if (last is not None and command not in action_commands and last["command"] == command
+                and last["locator"] == locator and not self._logs):
+            last["count"] += 1
+            last["duration"] += duration
+            return
+        step = {
+            "time": time.perf_counter() - self._started,
+            "command": command,
+            "locator": locator,
+            "count": 1,
+            "duration": duration,
+            "failed": response is None,
+            "logs": list(self._logs),
+            "screenshot": None,
+        }
+        self._logs.clear()
+        if command in action_commands:
+            self._url = self._raw(Command.GET_CURRENT_URL)
+            step["screenshot"] = self._capture()
+        step["url"] = self._url
+        self.steps.append(step)
+
+    def _locator(self, command, params, response):
+        """
+        Names the target of a command; element commands are named after the locator that found the element.
+        """
+        params = params or {}
+        locator = Instrumentation.locator_of(params)
+        value = response.get("value") if isinstance(response, dict) else None
+        if locator and isinstance(value, dict) and _element_key in value:
+            self._locators[value[_element_key]] = locator
+        elif locator and isinstance(value, list):
+            for element in value:
+                if isinstance(element, dict) and _element_key in element:
+                    self._locators[element[_element_key]] = locator
+        if locator is None and "id" in params:
+            locator = self._locators.get(params["id"])
+        return locator
+
+    def _raw(self, command, params=None):
+        """
+        Sends a command around the recorder, so tracing never records or times its own commands.
+        """
+        try:
+            return self.recorder._execute(command, params)["value"]
+        except Exception:  # The browser may be busy or gone; the step is kept without the value
+            return None
+
+    def _capture(self):
+        """
+        Takes the step screenshot: a scaled JPEG rendered by Chromium, else the PNG screenshot, downscaled on dump.
+        :return: Tuple (MIME type, base64 data), or None
+        """
+        if hasattr(self.driver, "execute_cdp_cmd"):
+            if self._viewport is None:
+                metrics = self._raw("executeCdpCommand", {"cmd": "Page.getLayoutMetrics", "params": {}}) or {}
+                viewport = metrics.get("cssLayoutViewport")
+                self._viewport = (viewport["clientWidth"], viewport["clientHeight"]) if viewport else (0, 0)
+            if all(self._viewport):
+                result = self._raw("executeCdpCommand", {"cmd": "Page.captureScreenshot", "params": {
+                    "format": "jpeg", "quality": screenshot_quality,
+                    "clip": {"x": 0, "y": 0, "width": self._viewport[0], "height": self._viewport[1],
+                             "scale": screenshot_scale}}})
+                return ("image/jpeg", result["data"]) if result else None
+        data = self._raw(Command.SCREENSHOT)
+        return ("image/png", data) if data else None
+
+    def dump(self, nodeid, outcome):
+        """
+        Writes the recorded steps as an HTML timeline.
+        :param nodeid: pytest node ID of the traced test.
+        :param outcome: Outcome shown in the title, e.g. 'failed' or 'xfailed'.
+        :return: Path of the written file
+        """
+        name = re.sub(r"[^\w.-]+", "_", nodeid.split("::", 1)[-1])[:80]
+        digest = hashlib.sha1(nodeid.encode("utf-8")).hexdigest()[:8]
+        path = os.path.join(Workers.worker_dir("traces"), "%s-%s.html" % (name, digest))
+        rows = "".join(_step_html(index, step) for index, step in enumerate(self.steps, 1))
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(_page_html % {"title": html.escape("%s (%s)" % (nodeid, outcome)), "rows": rows})
+        return path
+
+
+class _LogTap(logging.Handler):
+    """
+    Collects the log lines written while a test runs into the current step.
+    """
+
+    def __init__(self, lines):
+        super().__init__()
+        self.lines = lines
+        self.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+_page_html = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>%(title)s</title>
+<style>
+    body { font-family: sans-serif; margin: 1em; }
+    table { border-collapse: collapse; }
+    td, th { border-bottom: 1px solid #ddd; padding: 4px 8px; text-align: left; vertical-align: top; font-size: 13px; }
+    tr.failed { background: #fde8e8; }
+    pre { margin: 0; white-space: pre-wrap; }
+    img { max-width: 480px; border: 1px solid #ccc; }
+</style>
+</head>
+<body>
+<h1>%(title)s</h1>
+<table>
+<tr><th>#</th><th>At</th><th>Command</th><th>Locator</th><th>URL</th><th>Log</th><th>Screenshot</th></tr>
+%(rows)s
+</table>
+</body>
+</html>
+"""
+
+
+def _step_html(index, step):
+    command = step["command"] + (" x%d" % step["count"] if step["count"] > 1 else "")
+    image = ""
+    if step["screenshot"]:
+        mime, data = _downscale(*step["screenshot"])
+        image = '<img src="data:%s;base64,%s" alt="step %d">' % (mime, data, index)
+    return '<tr class="%s"><td>%d</td><td>%.3fs</td><td>%s<br>%.3fs</td><td>%s</td><td>%s</td><td><pre>%s</pre></td><td>%s</td></tr>\n' % (
+        "failed" if step["failed"] else "", index, step["time"], html.escape(command), step["duration"],
+        html.escape(step["locator"] or ""), html.escape(step["url"] or ""), html.escape("\n".join(step["logs"])), image)
+
+
+def _downscale(mime, data):
+    if mime != "image/png" or Image is None:
+        return mime, data
+    image = Image.open(io.BytesIO(base64.b64decode(data)))
+    image = image.resize((max(1, int(image.width * screenshot_scale)), max(1, int(image.height * screenshot_scale))))
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, "JPEG", quality=screenshot_quality)
+    return "image/jpeg", base64.b64encode(buffer.getvalue()).decode("ascii")
@@ -0,0 +1,433 @@
+import time
+import weakref
+from abc import ABC, abstractmethod
+
+from selenium.common.exceptions import (JavascriptException, NoSuchElementException, StaleElementReferenceException,
+                                        TimeoutException)
+from selenium.webdriver.support import expected_conditions as EC
+
+from utilities import Instrumentation
+
+# Defaults shared by every Waiter, overridden from the command line in conftest
+default_timeout = 10
+# Interval of the first re-check; doubled after every miss up to poll_frequency
+initial_poll = 0.05
+poll_frequency = 0.5
+# 'poll' re-checks conditions over the wire; 'event' lets the page watch them and answer a single async script call
+mode = "poll"
+# Implicit wait given to new browsers: explicit waits cover every lookup in event mode, so none is needed there
+implicit_wait = 5
+# Longest single async script call of an event wait, below Selenium's default 30s script timeout
+max_script_wait = 25
+
+# Defines findAll(by, value), returning every element matching a Selenium locator in document order
+find_elements_script = """
+    function findAll(by, value) {
+        var nodes = [], i;
+        switch (by) {
+            case 'xpath':
+                var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                for (i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+                return nodes;
+            case 'id':
+                return document.querySelectorAll('#' + CSS.escape(value));
+            case 'name':
+                return document.querySelectorAll('[name="' + CSS.escape(value) + '"]');
+            case 'class name':
+                return document.getElementsByClassName(value);
+            case 'tag name':
+                return document.getElementsByTagName(value);
+            case 'link text':
+            case 'partial link text':
+                return Array.prototype.filter.call(document.getElementsByTagName('a'), function (a) {
+                    var text = a.innerText.trim();
+                    return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+                });
+            default:
+                return document.querySelectorAll(value);
+        }
+    }
+"""
+
+# Prelude of the event wait scripts. waitFor(check, pollMs) re-evaluates check() on every DOM
+# mutation and every pollMs (style changes from animations or stylesheets cause no mutation), and
+# calls back with its first truthy value, or with null once the time given as second to last argument is up.
+# Listeners a condition installs are registered with onFinish(), which removes them when the wait ends
+observe_script = find_elements_script + """
+    var done = arguments[arguments.length - 1], timeoutMs = arguments[arguments.length - 2], cleanups = [];
+    function onFinish(cleanup) { cleanups.push(cleanup); }
+    function isVisible(el) {
+        for (var node = el; node && node.nodeType === 1; node = node.parentElement) {
+            var style = window.getComputedStyle(node);
+            if (style.display === 'none' || style.opacity === '0' || (node === el && style.visibility === 'hidden')) {
+                return false;
+            }
+        }
+        var rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    }
+    function waitFor(check, pollMs) {
+        var finished = false, observer = new MutationObserver(evaluate), poll, timer;
+        function finish(value) {
+            if (finished) { return; }
+            finished = true;
+            observer.disconnect();
+            clearInterval(poll);
+            clearTimeout(timer);
+            cleanups.forEach(function (cleanup) { cleanup(); });
+            done(value);
+        }
+        function evaluate() {
+            var value = null;
+            try { value = check(); } catch (e) {}
+            if (value) { finish(value); }
+        }
+        observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+        poll = setInterval(evaluate, pollMs || 250);
+        timer = setTimeout(function () { finish(null); }, timeoutMs);
+        evaluate();
+    }
+"""
+
+# One Waiter per driver and timeout, shared by every page object built on that driver
+_waiters = weakref.WeakKeyDictionary()
+
+# Polling pauses are part of the wait, not test sleeps, so keep them out of sleep instrumentation
+_sleep = time.sleep
+
+
+class Waiter:
+    """
+    Condition-based wait used by the page objects in place of fixed sleeps.
+    The condition is checked immediately, so a satisfied condition costs no sleep at all,
+    then re-checked with a short interval that backs off to poll_frequency.
+    """
+
+    def __init__(self, driver, timeout=None, poll=None):
+        """
+        Initializes the Waiter.
+        :param driver: WebDriver instance the conditions are evaluated against.
+        :param timeout: Seconds to wait before giving up, defaults to default_timeout.
+        :param poll: Longest interval between two checks, defaults to poll_frequency.
+        """
+        self.driver = driver
+        self.timeout = default_timeout if timeout is None else timeout
+        self.poll = poll_frequency if poll is None else poll
+        self.ignored_exceptions = (NoSuchElementException, StaleElementReferenceException)
+
+    def until(self, condition, message=""):
+        """
+        Waits until the condition returns a truthy value.
+        In event mode, conditions defining a script are watched by the page instead of polled.
+        :param condition: Callable taking the driver, e.g. an expected_conditions object.
+        :param message: Message of the TimeoutException raised on timeout.
+        :return: The last value returned by the condition
+        """
+        if mode == "event" and getattr(condition, "script", None):
+            return self._until_event(condition, message)
+        screen = stacktrace = None
+        start_time = time.monotonic()
+        end_time = start_time + self.timeout
+        interval = min(initial_poll, self.poll)
+        while True:
+            try:
+                value = condition(self.driver)
+                if value:
+                    self._record(condition, start_time, True)
+                    return value
+            except self.ignored_exceptions as exc:
+                screen = getattr(exc, "screen", None)
+                stacktrace = getattr(exc, "stacktrace", None)
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                break
+            _sleep(min(interval, remaining))
+            interval = min(interval * 2, self.poll)
+        self._record(condition, start_time, False)
+        raise TimeoutException(message, screen, stacktrace)
+
+    def _until_event(self, condition, message):
+        """
+        Waits for a condition inside the page: one async script call per max_script_wait seconds,
+        answered as soon as a DOM change, or the script's own short re-check, satisfies the condition.
+        """
+        start_time = time.monotonic()
+        end_time = start_time + self.timeout
+        while True:
+            remaining_ms = int(min(end_time - time.monotonic(), max_script_wait) * 1000)
+            if remaining_ms <= 0:
+                break
+            try:
+                value = self.driver.execute_async_script(
+                    observe_script + condition.script, *condition.arguments(), remaining_ms)
+            except JavascriptException:  # The page navigated away during the wait, watch the new one
+                _sleep(initial_poll)
+                continue
+            if value:
+                self._record(condition, start_time, True)
+                return value
+        self._record(condition, start_time, False)
+        raise TimeoutException(message)
+
+    def until_not(self, condition, message=""):
+        """
+        Waits until the condition returns a falsy value.
+        :param condition: Callable taking the driver.
+        :param message: Message of the TimeoutException raised on timeout.
+        :return: True once the condition is falsy
+        """
+        return self.until(lambda driver: not condition(driver), message)
+
+    def _record(self, condition, start_time, satisfied):
+        recorder = Instrumentation.recorder_for(self.driver)
+        if recorder is not None:
+            name = getattr(condition, "__qualname__", None) or type(condition).__name__
+            recorder.record_wait(name, time.monotonic() - start_time, satisfied)
+
+
+def waiter_for(driver, timeout=None):
+    """
+    Returns the Waiter shared by all page objects using this driver and timeout.
+    :param driver: WebDriver instance.
+    :param timeout: Seconds to wait before giving up, defaults to default_timeout.
+    :return: Waiter instance
+    """
+    timeout = default_timeout if timeout is None else timeout
+    waiters = _waiters.setdefault(driver, {})
+    if timeout not in waiters:
+        waiters[timeout] = Waiter(driver, timeout)
+    return waiters[timeout]
+
+
+class _ElementCondition(ABC):
+    """
+    Base for conditions on the first element matching a locator, checked with an expected_conditions
+    object when polling and by `check`, a JS expression on `el`, in event mode.
+    """
+
+    check = "el"
+
+    def __init__(self, locator):
+        self.locator = locator
+        self.script = """
+            var by = arguments[0], value = arguments[1];
+            waitFor(function () {
+                var el = findAll(by, value)[0];
+                return el && (%s) ? el : null;
+            });
+        """ % self.check
+
+    def arguments(self):
+        return list(self.locator)
+
+    @abstractmethod
+    def expected(self):
+        """
+        Builds the expected_conditions object checking the element when polling.
+        """
+
+    def __call__(self, driver):
+        return self.expected()(driver)
+
+
+class element_present(_ElementCondition):
+    """
+    Condition satisfied when the element is in the DOM.
+    :return: The element
+    """
+
+    def expected(self):
+        return EC.presence_of_element_located(self.locator)
+
+
+class element_visible(_ElementCondition):
+    """
+    Condition satisfied when the element is present and displayed.
+    :return: The element
+    """
+
+    check = "isVisible(el)"
+
+    def expected(self):
+        return EC.visibility_of_element_located(self.locator)
+
+
+class element_clickable(_ElementCondition):
+    """
+    Condition satisfied when the element is visible and enabled.
+    :return: The element
+    """
+
+    check = "isVisible(el) && !el.disabled"
+
+    def expected(self):
+        return EC.element_to_be_clickable(self.locator)
+
+
+class page_loaded:
+    """
+    Condition satisfied once the document has finished loading.
+    """
+
+    script = """
+        waitFor(function () { return document.readyState === 'complete'; });
+    """
+
+    def arguments(self):
+        return []
+
+    def __call__(self, driver):
+        return driver.execute_script("return document.readyState") == "complete"
+
+
+class _Quiet(ABC):
+    """
+    Base for conditions that hold once a sampled value stops changing for quiet_ms.
+    """
+
+    def __init__(self, quiet_ms):
+        self.quiet_ms = quiet_ms
+        self._last = None
+        self._since = None
+
+    @abstractmethod
+    def sample(self, driver):
+        """
+        Reads the value watched for changes, None while it cannot be read yet.
+        """
+
+    def result(self, driver, value):
+        return True
+
+    def __call__(self, driver):
+        value = self.sample(driver)
+        now = time.monotonic()
+        if value is None or value != self._last:
+            self._last, self._since = value, now
+            return False
+        if (now - self._since) * 1000 < self.quiet_ms:
+            return False
+        return self.result(driver, value)
+
+
+class overlay_settled(_Quiet):
+    """
+    Condition satisfied when an element is visible and its position and size
+    have not changed for quiet_ms, i.e. any opening animation has finished.
+    :return: The element
+    """
+
+    script = """
+        var by = arguments[0], value = arguments[1], quietMs = arguments[2], last = null, since = 0;
+        waitFor(function () {
+            var el = findAll(by, value)[0];
+            if (!el || !isVisible(el)) { last = null; return null; }
+            var rect = el.getBoundingClientRect();
+            var sample = [rect.x, rect.y, rect.width, rect.height].join();
+            if (sample !== last) { last = sample; since = performance.now(); return null; }
+            return performance.now() - since >= quietMs ? el : null;
+        }, 50);
+    """
+
+    def __init__(self, locator, quiet_ms=150):
+        super().__init__(quiet_ms)
+        self.locator = locator
+        self._element = None
+
+    def arguments(self):
+        return list(self.locator) + [self.quiet_ms]
+
+    def sample(self, driver):
+        element = driver.find_element(*self.locator)
+        if not element.is_displayed():
+            return None
+        self._element = element
+        return tuple(sorted(element.rect.items()))
+
+    def result(self, driver, value):
+        return self._element
+
+
+class dom_stable(_Quiet):
+    """
+    Condition satisfied once the document is loaded and its element count
+    and text length have not changed for quiet_ms.
+    """
+
+    sample_script = """
+        if (document.readyState !== 'complete' || !document.body) { return null; }
+        return [document.getElementsByTagName('*').length, document.body.innerText.length];
+    """
+
+    script = """
+        var quietMs = arguments[0], lastChange = performance.now();
+        var changes = new MutationObserver(function () { lastChange = performance.now(); });
+        changes.observe(document, {childList: true, subtree: true, characterData: true});
+        onFinish(function () { changes.disconnect(); });
+        waitFor(function () {
+            return document.readyState === 'complete' && performance.now() - lastChange >= quietMs;
+        }, 50);
+    """
+
+    def __init__(self, quiet_ms=300):
+        super().__init__(quiet_ms)
+
+    def arguments(self):
+        return [self.quiet_ms]
+
+    def sample(self, driver):
+        return driver.execute_script(dom_stable.sample_script)
+
+
+class network_idle(_Quiet):
+    """
+    Condition satisfied once the document is loaded and no new resource
+    (XHR, fetch, script, image...) has started for quiet_ms.
+    """
+
+    sample_script = """
+        if (document.readyState !== 'complete') { return null; }
+        performance.setResourceTimingBufferSize(100000);
+        return performance.getEntriesByType('resource').length;
+    """
+
+    # Counts fetch and XHR requests in flight (installed once per document) and takes the
+    # end of every resource load from a PerformanceObserver
+    script = """
+        var quietMs = arguments[0], lastActivity = performance.now();
+        if (!window.__waitsNetwork) {
+            var network = window.__waitsNetwork = {inflight: 0};
+            var fetch = window.fetch;
+            if (fetch) {
+                window.fetch = function () {
+                    network.inflight++;
+                    return fetch.apply(this, arguments).finally(function () { network.inflight--; });
+                };
+            }
+            var send = XMLHttpRequest.prototype.send;
+            XMLHttpRequest.prototype.send = function () {
+                network.inflight++;
+                this.addEventListener('loadend', function () { network.inflight--; }, {once: true});
+                return send.apply(this, arguments);
+            };
+        }
+        var resources = new PerformanceObserver(function () { lastActivity = performance.now(); });
+        resources.observe({type: 'resource'});
+        onFinish(function () { resources.disconnect(); });
+        waitFor(function () {
+            if (document.readyState !== 'complete' || window.__waitsNetwork.inflight > 0) {
+                lastActivity = performance.now();
+                return false;
+            }
+            return performance.now() - lastActivity >= quietMs;
+        }, 50);
+    """
+
+    def __init__(self, quiet_ms=500):
+        super().__init__(quiet_ms)
+
+    def arguments(self):
+        return [self.quiet_ms]
+
+    def sample(self, driver):
+        return driver.execute_script(network_idle.sample_script)
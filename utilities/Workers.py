@@ -0,0 +1,33 @@
+import os
+
+# Root directory for everything a run produces (screenshots, logs, reports)
+artifacts_root = "reports"
+
+
+def worker_id():
+    """
+    Returns the id of the current worker process.
+    :return: xdist worker id such as 'gw0', or 'main' when tests are not distributed
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+def worker_dir(kind):
+    """
+    Returns a directory private to the current worker, creating it if needed.
+    :param kind: Type of artifact stored in the directory, e.g. 'screenshots' or 'logs'
+    :return: Path of the directory
+    """
+    path = os.path.join(artifacts_root, kind, worker_id())
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def is_controller(config):
+    """
+    Tells whether the process is the pytest-xdist controller, which hands the tests out to the
+    workers and runs none itself.
+    :param config: pytest Config of the process.
+    :return: True on the controller of a distributed run
+    """
+    return not hasattr(config, "workerinput") and getattr(config.option, "dist", "no") != "no"